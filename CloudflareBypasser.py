@@ -1,34 +1,83 @@
 import time
+from collections import deque
 from DrissionPage import ChromiumPage
 
+CHALLENGE_TITLE = "Just a moment"
+# Recent attempt durations kept for inspection, totals live in stats
+RECENT_ATTEMPTS = 100
+
 class CloudflareBypasser:
-    def __init__(self, driver: ChromiumPage, max_retries=-1, log=True):
+    def __init__(self, driver: ChromiumPage, max_retries=-1, log=True,
+                 timeout=60, attempt_timeout=5, max_depth=25, search_timeout=3):
         self.driver = driver
         self.max_retries = max_retries
         self.log = log
+        # Total time a bypass may take, bounds max_retries=-1 as well
+        self.timeout = timeout
+        self.attempt_timeout = attempt_timeout
+        # Bounds of the recursive shadow DOM search
+        self.max_depth = max_depth
+        self.search_timeout = search_timeout
+        # Child index path from <body> to the turnstile host found last time
+        self._cached_path = None
+        self.stats = {
+            'challenges': 0, 'passed': 0, 'failed': 0, 'attempts': 0,
+            'attempt_seconds': 0.0, 'max_attempt_seconds': 0.0
+        }
+        self.attempt_timings = deque(maxlen=RECENT_ATTEMPTS)
+
+    @property
+    def success_rate(self) -> float:
+        if not self.stats['challenges']:
+            return 1.0
+        return self.stats['passed'] / self.stats['challenges']
 
-    def search_recursively_shadow_root_with_iframe(self,ele):
+    def search_recursively_shadow_root_with_iframe(self, ele, deadline=None, depth=0, path=()):
+        if depth > self.max_depth or (deadline and time.monotonic() > deadline):
+            return None
         if ele.shadow_root:
             if ele.shadow_root.child().tag == "iframe":
+                self._cached_path = path
                 return ele.shadow_root.child()
         else:
-            for child in ele.children():
-                result = self.search_recursively_shadow_root_with_iframe(child)
+            for index, child in enumerate(ele.children()):
+                result = self.search_recursively_shadow_root_with_iframe(
+                    child, deadline, depth + 1, path + (index,)
+                )
                 if result:
                     return result
         return None
 
-    def search_recursively_shadow_root_with_cf_input(self,ele):
+    def search_recursively_shadow_root_with_cf_input(self, ele, deadline=None, depth=0):
+        if depth > self.max_depth or (deadline and time.monotonic() > deadline):
+            return None
         if ele.shadow_root:
             if ele.shadow_root.ele("tag:input"):
                 return ele.shadow_root.ele("tag:input")
         else:
             for child in ele.children():
-                result = self.search_recursively_shadow_root_with_cf_input(child)
+                result = self.search_recursively_shadow_root_with_cf_input(child, deadline, depth + 1)
                 if result:
                     return result
         return None
-    
+
+    def _follow_cached_path(self):
+        """Walk straight to the turnstile host found on a previous challenge"""
+        if self._cached_path is None:
+            return None
+        try:
+            ele = self.driver.ele("tag:body")
+            for index in self._cached_path:
+                children = ele.children()
+                if index >= len(children):
+                    return None
+                ele = children[index]
+            if ele.shadow_root and ele.shadow_root.child().tag == "iframe":
+                return ele.shadow_root.child()
+        except Exception:
+            pass
+        return None
+
     def locate_cf_button(self):
         button = None
         eles = self.driver.eles("tag:input")
@@ -37,19 +86,21 @@ class CloudflareBypasser:
                 if "turnstile" in ele.attrs["name"] and ele.attrs["type"] == "hidden":
                     button = ele.parent().shadow_root.child()("tag:body").shadow_root("tag:input")
                     break
-            
+
         if button:
             return button
-        else:
+
+        deadline = time.monotonic() + self.search_timeout
+        iframe = self._follow_cached_path()
+        if not iframe:
             # If the button is not found, search it recursively
             self.log_message("Basic search failed. Searching for button recursively.")
-            ele = self.driver.ele("tag:body")
-            iframe = self.search_recursively_shadow_root_with_iframe(ele)
-            if iframe:
-                button = self.search_recursively_shadow_root_with_cf_input(iframe("tag:body"))
-            else:
-                self.log_message("Iframe not found. Button search failed.")
-            return button
+            iframe = self.search_recursively_shadow_root_with_iframe(self.driver.ele("tag:body"), deadline)
+        if iframe:
+            button = self.search_recursively_shadow_root_with_cf_input(iframe("tag:body"), deadline)
+        else:
+            self.log_message("Iframe not found. Button search failed.")
+        return button
 
     def log_message(self, message):
         if self.log:
@@ -70,27 +121,54 @@ class CloudflareBypasser:
     def is_bypassed(self):
         try:
             title = self.driver.title.lower()
-            return "just a moment" not in title
+            return CHALLENGE_TITLE.lower() not in title
         except Exception as e:
             self.log_message(f"Error checking page title: {e}")
             return False
 
+    def wait_until_cleared(self, timeout):
+        """Wait for the challenge title to go away instead of sleeping a fixed time"""
+        try:
+            self.driver.wait.title_change(CHALLENGE_TITLE, exclude=True, timeout=timeout)
+        except Exception:
+            # Fall back to short polling if the wait API is unavailable
+            deadline = time.monotonic() + timeout
+            while not self.is_bypassed() and time.monotonic() < deadline:
+                time.sleep(0.2)
+        return self.is_bypassed()
+
     def bypass(self):
-        
+        if self.is_bypassed():
+            return True
+
+        self.stats['challenges'] += 1
+        deadline = time.monotonic() + self.timeout
         try_count = 0
 
         while not self.is_bypassed():
             if 0 < self.max_retries + 1 <= try_count:
                 self.log_message("Exceeded maximum retries. Bypass failed.")
                 break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.log_message("Exceeded bypass timeout. Bypass failed.")
+                break
 
             self.log_message(f"Attempt {try_count + 1}: Verification page detected. Trying to bypass...")
+            attempt_start = time.monotonic()
             self.click_verification_button()
-
+            self.wait_until_cleared(min(self.attempt_timeout, remaining))
+            attempt_time = time.monotonic() - attempt_start
+            self.attempt_timings.append(attempt_time)
+            self.stats['attempts'] += 1
+            self.stats['attempt_seconds'] += attempt_time
+            self.stats['max_attempt_seconds'] = max(self.stats['max_attempt_seconds'], attempt_time)
             try_count += 1
-            time.sleep(2)
 
         if self.is_bypassed():
+            self.stats['passed'] += 1
             self.log_message("Bypass successful.")
-        else:
-            self.log_message("Bypass failed.")
+            return True
+        self.stats['failed'] += 1
+        self.log_message("Bypass failed.")
+        return False
@@ -1,6 +1,9 @@
 import argparse
 from typing import Dict, Any
 from exporters import get_available_fields
+from network import RESOURCE_TYPES, DEFAULT_BLOCKED_TYPES
+from config import PATHS
+from rate_limiter import DEFAULT_MAX_RATE
 
 def create_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser()
@@ -10,16 +13,58 @@ def create_argument_parser() -> argparse.ArgumentParser:
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
     parser.add_argument("--max_pages", type=int, default=1, help="Maximum pages to scrape")
     parser.add_argument("--delay", type=float, default=1.5, help="Delay between requests")
+    parser.add_argument("--max-rate", type=float, default=DEFAULT_MAX_RATE, help="Highest request rate (req/s) the adaptive limiter may reach")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of browser tabs used for detail pages")
+    parser.add_argument("--pipeline", action="store_true", help="Fetch the next results page while details are processed")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Drive the results and detail tabs from one asyncio event loop")
+    parser.add_argument("--queue-size", type=int, default=50, help="Listings pagination may run ahead of the writer in pipeline mode")
+    parser.add_argument("--block", dest="block_resources", nargs='*', choices=list(RESOURCE_TYPES), default=list(DEFAULT_BLOCKED_TYPES),
+                        help="Resource types to block, pass no values to allow all")
+    parser.add_argument("--block-pattern", dest="block_patterns", nargs='+', help="Extra URL patterns to block, e.g. '*.example.com/*'")
+    parser.add_argument("--skip-unchanged", action="store_true", help="Reuse stored details of listings unchanged since the last crawl")
+    parser.add_argument("--fingerprint-db", help="Listing fingerprint database used by --skip-unchanged")
+    parser.add_argument("--rebuild-profile-template", action="store_true", help="Copy the Chrome profile into the cached template again before scraping")
+    parser.add_argument("--http-details", action="store_true", help="Fetch detail pages over HTTP with the browser's cookies, falling back to the browser on challenges")
+    parser.add_argument("--shard", action="store_true", help="Split the search into price bands that each fit under the pagination cap")
+    parser.add_argument("--shard-cap", type=int, help="Results the site paginates per search (default 1000)")
+    
+    # Metrics
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port (/metrics, /metrics.json)")
+    parser.add_argument("--metrics-file", help="Write a JSON metrics snapshot to this file every 10 seconds")
+    
+    # Profiling
+    parser.add_argument("--profile", choices=['cprofile', 'sample'], help="Profile the scrape or export run")
+    parser.add_argument("--profile-dir", default=PATHS['PROFILES'], help="Directory for collapsed stacks and hotspot summaries")
+    parser.add_argument("--profile-top", type=int, default=25, help="Functions listed per hotspot table")
     
     # Export arguments
-    parser.add_argument("--export", choices=['csv', 'excel', 'json'], help="Export format")
-    parser.add_argument("--export-file", help="Export file path")
+    parser.add_argument("--export", nargs='+', choices=['csv', 'excel', 'json', 'parquet'], help="Export formats, written in one pass")
+    parser.add_argument("--export-file", help="Export file path, the extension is replaced per format when exporting several")
+    parser.add_argument("--parallel", choices=['thread', 'process'], help="Run export writers in parallel")
+    parser.add_argument("--input", help="Scraped data file to export (JSON or JSONL)")
+    parser.add_argument("--partition-by", nargs='+', choices=['scrape_date', 'location'], help="Parquet partition columns")
+    parser.add_argument("--row-group-size", type=int, default=50000, help="Rows per Parquet row group")
     parser.add_argument("--fields", nargs='+', help="Fields to export")
     parser.add_argument("--list-fields", action="store_true", help="List available fields")
+    parser.add_argument("--normalize", metavar="OUTPUT", help="Write a normalized JSONL copy of --input (or the data file)")
+    
+    # Continuous data sink
+    parser.add_argument("--rotate-mb", type=float, help="Start a new data segment after this many MB")
+    parser.add_argument("--rotate-minutes", type=float, help="Start a new data segment after this many minutes")
+    parser.add_argument("--compress", choices=['gzip', 'zstd'], help="Compress data segments")
+    parser.add_argument("--fsync-interval", type=float, help="Seconds between fsyncs of the data segment")
+    parser.add_argument("--listing-db", default=PATHS['LISTING_DB'], help="Queryable listing store, see listing_store.py")
+    parser.add_argument("--no-listing-db", action="store_true", help="Do not write the listing store")
     
     # State management
     parser.add_argument("--state", help="State file to save/load")
     parser.add_argument("--resume", action="store_true", help="Resume from state file")
+    parser.add_argument("--state-backend", choices=['sqlite', 'json'], default='sqlite',
+                        help="State storage backend, JSON state files are migrated to SQLite")
+    parser.add_argument("--coordinator", help="Shared work queue database, runs this process as one worker of the crawl")
+    parser.add_argument("--worker-id", help="Worker name in the work queue (default host-pid)")
+    parser.add_argument("--lease-timeout", type=float, default=120.0, help="Seconds before work of a silent worker is handed to another")
+    parser.add_argument("--seen-ids", help="Seen listing id set shared across runs and searches, defaults to one per state file")
     
     return parser
 
@@ -27,7 +72,28 @@ def get_scraper_args(args: argparse.Namespace) -> Dict[str, Any]:
     return {
         'max_pages': args.max_pages,
         'delay': args.delay,
-        'headless': args.headless
+        'max_rate': args.max_rate,
+        'headless': args.headless,
+        'concurrency': args.concurrency,
+        'pipeline': args.pipeline,
+        'queue_size': args.queue_size,
+        'block_resources': args.block_resources,
+        'block_patterns': args.block_patterns,
+        'skip_unchanged': args.skip_unchanged,
+        'fingerprint_db': args.fingerprint_db,
+        'http_details': args.http_details,
+        'shard': args.shard,
+        'shard_cap': args.shard_cap,
+        'metrics_port': args.metrics_port,
+        'metrics_file': args.metrics_file
+    }
+
+def get_sink_args(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        'max_bytes': int(args.rotate_mb * 1024 * 1024) if args.rotate_mb else None,
+        'max_age': args.rotate_minutes * 60 if args.rotate_minutes else None,
+        'compression': args.compress,
+        'fsync_interval': args.fsync_interval
     }
 
 def handle_export_args(args: argparse.Namespace):
@@ -0,0 +1,150 @@
+from controllers.sahibinden_controller import SahibindenScrapeController
+from state_manager import StateManager, create_state_manager
+from mock_site import MockSite, add_mock_site_arguments, config_from_args
+from collections import defaultdict
+from typing import Dict, List
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class BenchmarkController(SahibindenScrapeController):
+    """Scrape controller that records per-stage latencies instead of saving data"""
+    def __init__(self, state_manager: StateManager):
+        super().__init__(state_manager)
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.pages = 0
+        self.listings = 0
+        self.errors = 0
+
+    def _timed(self, stage: str, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.timings[stage].append(time.perf_counter() - start)
+
+    def initialize_scraper(self, **kwargs):
+        start = time.perf_counter()
+        super().initialize_scraper(**kwargs)
+        self.timings['startup'].append(time.perf_counter() - start)
+
+    def scrape_page(self, url: str):
+        listings = self._timed('results_page', super().scrape_page, url)
+        self.pages += 1
+        return listings
+
+    def iter_details(self, listings):
+        # Time spent waiting for each result, so it works with and without the tab pool
+        details = super().iter_details(listings)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(details)
+            except StopIteration:
+                return
+            self.timings['detail'].append(time.perf_counter() - start)
+            yield item
+
+    def get_next_page(self, url: str) -> str:
+        return self._timed('next_page', super().get_next_page, url)
+
+    def on_listing_processed(self, listing_data: dict):
+        self.listings += 1
+
+    def on_error(self, error: Exception):
+        self.errors += 1
+        self.logger.error(f"Error during benchmark: {error}")
+
+    def on_progress(self, message: str):
+        self.logger.info(message)
+
+    def on_completed(self):
+        self.logger.info("Benchmark run completed")
+
+    def close_scraper(self):
+        super().close_scraper()
+        if self.scraper:
+            self.scraper.close()
+
+    def report(self, elapsed: float) -> dict:
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'pages': self.pages,
+            'listings': self.listings,
+            'errors': self.errors,
+            'pages_per_s': round(self.pages / elapsed, 3) if elapsed else 0.0,
+            'listings_per_s': round(self.listings / elapsed, 3) if elapsed else 0.0,
+            'stages': {
+                stage: {
+                    'count': len(values),
+                    'p50_ms': round(percentile(values, 50) * 1000, 1),
+                    'p90_ms': round(percentile(values, 90) * 1000, 1),
+                    'p99_ms': round(percentile(values, 99) * 1000, 1),
+                    'max_ms': round(max(values) * 1000, 1),
+                }
+                for stage, values in self.timings.items() if values
+            }
+        }
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    scraper_args = {
+        'max_pages': args.pages,
+        'delay': args.delay,
+        'max_rate': args.max_rate,
+        'headless': args.headless,
+        'concurrency': args.concurrency
+    }
+    with MockSite(config_from_args(args)) as site, tempfile.TemporaryDirectory() as tmp:
+        state_manager = create_state_manager(os.path.join(tmp, 'benchmark_state.db'))
+        state_manager.initialize_state(site.search_url, **scraper_args)
+        controller = BenchmarkController(state_manager)
+
+        start = time.perf_counter()
+        controller.start_scraping(site.search_url, scraper_args)
+        report = controller.report(time.perf_counter() - start)
+        report['site'] = {
+            'requests': site.stats.requests,
+            'errors': site.stats.errors,
+            'challenges': site.stats.challenges,
+            'bytes_sent': site.stats.bytes_sent
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against the offline mock site")
+    add_mock_site_arguments(parser)
+    parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument("--delay", type=float, default=0.0, help="Delay between requests")
+    parser.add_argument("--max-rate", type=float, default=50.0, help="Highest request rate (req/s), the mock site needs no throttling")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of browser tabs used for detail pages")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    report = run_benchmark(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,12 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Define all file paths relative to base directory
 PATHS = {
     'STATE_FILE': os.path.join(BASE_DIR, 'data', 'state', 'current_state.json'),
+    'FINGERPRINTS': os.path.join(BASE_DIR, 'data', 'state', 'fingerprints.db'),
     'CONTINUOUS_DATA': os.path.join(BASE_DIR, 'data', 'listings', 'continuous_data.json'),
+    'CONTINUOUS_JSONL': os.path.join(BASE_DIR, 'data', 'listings', 'continuous_data.jsonl'),
+    'LISTING_DB': os.path.join(BASE_DIR, 'data', 'listings', 'listings.db'),
     'DEFAULT_EXPORT': os.path.join(BASE_DIR, 'data', 'exports'),
+    'PROFILES': os.path.join(BASE_DIR, 'data', 'profiles'),
 }
 
 # Create necessary directories
@@ -0,0 +1,188 @@
+import asyncio
+from .base_controller import BaseScrapeController
+
+class AsyncScrapeController(BaseScrapeController):
+    """Controller variant that runs the crawl as asyncio tasks on one event loop.
+
+    A listing task walks results pages and starts one detail task per new
+    listing, a sink task persists finished listings in page order. All of
+    them live in one TaskGroup, so an error or stop() cancels the whole crawl
+    and nothing is left running. Detail fetches overlap up to concurrency.
+
+    The async hooks default to running the synchronous hooks in a worker
+    thread; subclasses override them with coroutines that drive the browser
+    without blocking the loop. run() can be scheduled on any running loop,
+    including the qasync one of main_ui.py; start_scraping() runs it to
+    completion on a fresh loop.
+    """
+    _loop = None
+    _task = None
+    _resumed = None
+
+    async def scrape_page_async(self, url: str):
+        return await asyncio.to_thread(self.scrape_page, url)
+
+    async def scrape_detail_async(self, url: str):
+        return await asyncio.to_thread(self.scrape_detail, url)
+
+    async def get_next_page_async(self, url: str) -> str:
+        return await asyncio.to_thread(self.get_next_page, url)
+
+    async def get_cached_details_async(self, listing):
+        return self.get_cached_details(listing)
+
+    async def process_listing_async(self, listing, details, fetched: bool = True):
+        # State and sink writes block on files, keep them off the loop
+        await asyncio.to_thread(self._process_listing, listing, details, fetched)
+
+    async def wait_if_paused_async(self) -> bool:
+        """Wait while paused without polling, returns False if scraping should stop"""
+        if self.paused and not self.should_stop:
+            await self._resumed.wait()
+        return not self.should_stop
+
+    def start_scraping(self, url: str, scraper_args: dict):
+        if scraper_args.get('shard'):
+            self.logger.info("Sharded crawls are not run asynchronously, using the threaded controller")
+            return super().start_scraping(url, scraper_args)
+        asyncio.run(self.run(url, scraper_args))
+
+    async def run(self, url: str, scraper_args: dict):
+        """Crawl url on the running loop until done, stopped or failed"""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._resumed = asyncio.Event()
+        if not self.paused:
+            self._resumed.set()
+        finished = False
+        # A cancelled to_thread leaves its thread running, the browser launch is
+        # shielded so close_scraper can wait for it instead of racing it
+        startup = asyncio.ensure_future(asyncio.to_thread(self.initialize_scraper, **scraper_args))
+        try:
+            await asyncio.shield(startup)
+            work = asyncio.Queue(maxsize=scraper_args.get('queue_size') or 50)
+            limit = asyncio.Semaphore(max(1, scraper_args.get('concurrency') or 1))
+            async with asyncio.TaskGroup() as tasks:
+                tasks.create_task(self._produce_listings_async(url, scraper_args, work, limit, tasks))
+                tasks.create_task(self._write_listings_async(work))
+            finished = not self.should_stop
+            if finished:
+                self.state_manager.mark_completed()
+                self.on_completed()
+        except asyncio.CancelledError:
+            self.on_progress("Scraping stopped")
+        except Exception as e:
+            # TaskGroup wraps task errors, report the underlying ones
+            for error in getattr(e, 'exceptions', [e]):
+                self.on_error(error)
+        finally:
+            self._task = None
+            await asyncio.wait([startup])
+            await asyncio.to_thread(self.close_scraper)
+            self.state_manager.save_state()
+
+    async def _fetch_details(self, listing, limit: asyncio.Semaphore):
+        """(details, error) of a listing, errors are reported by the sink task"""
+        async with limit:
+            if not await self.wait_if_paused_async():
+                return None, None
+            try:
+                return await self.scrape_detail_async(listing.detail_url), None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return None, e
+
+    async def _produce_listings_async(self, url: str, scraper_args: dict, work: asyncio.Queue,
+                                      limit: asyncio.Semaphore, tasks: asyncio.TaskGroup):
+        """Listing task, walks results pages and starts detail tasks"""
+        try:
+            current_page, last_id, _ = self.state_manager.get_resume_info()
+            while url and current_page <= scraper_args['max_pages']:
+                if not await self.wait_if_paused_async():
+                    return
+
+                self.on_progress(f"Starting to scrape page {current_page}")
+                listings = await self.scrape_page_async(url)
+
+                if last_id:
+                    listings = [l for l in listings if l.listing_id > last_id]
+                    last_id = None
+
+                for listing in listings:
+                    if self.state_manager.is_processed(listing.listing_id, listing.detail_url):
+                        self.on_progress(f"Skipping already processed: {listing.listing_id}")
+                        continue
+
+                    details = await self.get_cached_details_async(listing)
+                    if details:
+                        await work.put(('listing', (listing, None, details)))
+                        continue
+                    # The bounded queue keeps pagination from running far ahead
+                    detail_task = tasks.create_task(self._fetch_details(listing, limit))
+                    await work.put(('listing', (listing, detail_task, None)))
+
+                current_page += 1
+                await work.put(('page', current_page))
+                url = await self.get_next_page_async(url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await work.put(('error', e))
+        # Not reached on cancellation, the sink task is cancelled with this one
+        await work.put(None)
+
+    async def _write_listings_async(self, work: asyncio.Queue):
+        """Sink task, persists listings in the order they were listed"""
+        while True:
+            item = await work.get()
+            if item is None:
+                return
+            kind, payload = item
+            if kind == 'page':
+                self.state_manager.update_page(payload)
+            elif kind == 'error':
+                self.on_error(payload)
+            else:
+                listing, detail_task, details = payload
+                fetched = detail_task is not None
+                if fetched:
+                    details, error = await detail_task
+                    if error:
+                        self.on_error(error)
+                        continue
+                    if details is None:
+                        # Stopped while the listing was waiting
+                        return
+                await self.process_listing_async(listing, details, fetched)
+
+    def _call_in_loop(self, callback):
+        """Run callback on the crawl's loop, from the loop or any other thread"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback()
+        else:
+            loop.call_soon_threadsafe(callback)
+
+    def pause(self):
+        super().pause()
+        if self._resumed:
+            self._call_in_loop(self._resumed.clear)
+
+    def resume(self):
+        super().resume()
+        if self._resumed:
+            self._call_in_loop(self._resumed.set)
+
+    def stop(self):
+        """Stop scraping, cancelling page loads and detail fetches in flight"""
+        super().stop()
+        task = self._task
+        if task:
+            self._call_in_loop(task.cancel)
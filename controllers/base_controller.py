@@ -1,7 +1,16 @@
 from abc import ABC, abstractmethod
 import logging
+import threading
 import time
+from concurrent.futures import Future
+from queue import Queue, Empty, Full
+from dataclasses import asdict
+from typing import List
+from models import ListingData
 from state_manager import StateManager
+from shard_planner import Shard
+from work_queue import WorkQueue, LeaseKeeper, default_worker_id
+from metrics import registry as metrics
 
 class BaseScrapeController(ABC):
     def __init__(self, state_manager: StateManager):
@@ -56,71 +65,423 @@ class BaseScrapeController(ABC):
         """Handle completion of scraping"""
         pass
 
-    def start_scraping(self, url: str, scraper_args: dict):
-        """Main scraping logic"""
+    def close_scraper(self):
+        """Release resources held by the scraper, called once scraping ends"""
+        pass
+
+    def get_cached_details(self, listing):
+        """Return stored details of an unchanged listing, or None to fetch it"""
+        return None
+
+    def on_details_fetched(self, listing, details):
+        """Called with freshly fetched details of a listing"""
+        pass
+
+    def wait_if_paused(self) -> bool:
+        """Block while paused, returns False if scraping should stop"""
+        while self.paused and not self.should_stop:
+            time.sleep(0.1)
+        return not self.should_stop
+
+    def iter_details(self, listings):
+        """Yield (listing, details, error) for each listing in order"""
+        for listing in listings:
+            if not self.wait_if_paused():
+                return
+            try:
+                yield listing, self.scrape_detail(listing.detail_url), None
+            except Exception as e:
+                yield listing, None, e
+
+    def submit_detail(self, listing) -> Future:
+        """Start fetching details of a listing, returns a Future of the details"""
+        future = Future()
         try:
-            self.initialize_scraper(**scraper_args)
-            current_page, last_id, processed_urls = self.state_manager.get_resume_info()
+            future.set_result(self.scrape_detail(listing.detail_url))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _process_listing(self, listing, details, fetched: bool = True):
+        """Persist one listing and report it"""
+        try:
+            if fetched:
+                self.on_details_fetched(listing, details)
+            listing_data = self.create_listing_data(listing, details)
+            
+            self.state_manager.update_progress(
+                listing.listing_id, 
+                listing.detail_url
+            )
+            self.on_listing_processed(listing_data)
+            metrics.inc('listings_processed')
             
-            while url and current_page <= scraper_args['max_pages'] and not self.should_stop:
-                # Handle pause
-                while self.paused and not self.should_stop:
-                    time.sleep(0.1)
+        except Exception as e:
+            self.on_error(e)
+
+    def plan_shards(self, url: str, scraper_args: dict) -> List[Shard]:
+        """Split a search into independently scraped shards, one shard by default"""
+        return [Shard(url)]
+
+    def on_shard_started(self, shard: Shard):
+        """Called before the pages of a shard are scraped"""
+        pass
+
+    def _scrape_pages(self, url: str, max_pages: int, current_page: int, last_id=None,
+                      on_page=None) -> bool:
+        """Walk results pages from url, returns False if scraping was stopped.
+
+        on_page(page_number, next_url) is called after each finished page.
+        """
+        while url and current_page <= max_pages and not self.should_stop:
+            # Handle pause
+            while self.paused and not self.should_stop:
+                time.sleep(0.1)
+            
+            if self.should_stop:
+                self.on_progress("Scraping stopped")
+                return False
+
+            self.on_progress(f"Starting to scrape page {current_page}")
+            
+            try:
+                listings = self.scrape_page(url)
                 
+                if last_id:
+                    listings = [l for l in listings if l.listing_id > last_id]
+                    last_id = None
+                
+                pending = []
+                for listing in listings:
+                    if self.state_manager.is_processed(listing.listing_id, listing.detail_url):
+                        self.on_progress(f"Skipping already processed: {listing.listing_id}")
+                        continue
+                    pending.append(listing)
+
+                # Unchanged listings reuse stored details, the rest are fetched
+                cached = {}
+                for listing in pending:
+                    details = self.get_cached_details(listing)
+                    if details:
+                        cached[listing.listing_id] = details
+                fetched = self.iter_details(
+                    [l for l in pending if l.listing_id not in cached]
+                )
+
+                for listing in pending:
+                    # Check stop/pause for each listing
+                    if not self.wait_if_paused():
+                        self.on_progress("Scraping stopped")
+                        return False
+
+                    if listing.listing_id in cached:
+                        self.on_progress(f"Reusing details of unchanged listing: {listing.listing_id}")
+                        details = cached[listing.listing_id]
+                    else:
+                        try:
+                            listing, details, error = next(fetched)
+                        except StopIteration:
+                            break
+                        if error:
+                            self.on_error(error)
+                            continue
+
+                    self._process_listing(listing, details, listing.listing_id not in cached)
+
                 if self.should_stop:
                     self.on_progress("Scraping stopped")
+                    return False
+                        
+                current_page += 1
+                url = self.get_next_page(url)
+                if on_page:
+                    on_page(current_page, url)
+                
+            except Exception as e:
+                self.on_error(e)
+                break
+        return not self.should_stop
+
+    def start_scraping(self, url: str, scraper_args: dict):
+        """Main scraping logic"""
+        if scraper_args.get('shard'):
+            return self.start_sharded_scraping(url, scraper_args)
+        if scraper_args.get('pipeline'):
+            return self.start_pipelined_scraping(url, scraper_args)
+        try:
+            self.initialize_scraper(**scraper_args)
+            current_page, last_id, _ = self.state_manager.get_resume_info()
+            
+            if not self._scrape_pages(
+                url, scraper_args['max_pages'], current_page, last_id,
+                lambda page, _: self.state_manager.update_page(page)
+            ):
+                return
+
+            self.state_manager.mark_completed()
+            self.on_completed()
+            
+        except Exception as e:
+            self.on_error(e)
+        finally:
+            self.close_scraper()
+            self.state_manager.save_state()
+
+    def start_sharded_scraping(self, url: str, scraper_args: dict):
+        """Scrape a search shard by shard.
+
+        The shards are planned once and kept in state, so a resumed run
+        continues with the unfinished shards at the page they stopped at.
+        max_pages applies to each shard.
+        """
+        try:
+            self.initialize_scraper(**scraper_args)
+            shards = self.state_manager.get_shards()
+            if not shards:
+                self.on_progress("Planning shards")
+                shards = self.plan_shards(url, scraper_args)
+                self.state_manager.set_shards(shards)
+
+            for index, shard in enumerate(shards):
+                if shard.status == 'done':
+                    continue
+                self.on_progress(
+                    f"Starting shard {index + 1}/{len(shards)} "
+                    f"({shard.result_count if shard.result_count is not None else '?'} results)"
+                )
+                self.state_manager.update_shard(index, status='running')
+                self.on_shard_started(shard)
+
+                def on_page(page, next_url, index=index):
+                    self.state_manager.update_shard(index, current_page=page, next_url=next_url)
+
+                if not self._scrape_pages(
+                    shard.next_url or shard.url, scraper_args['max_pages'],
+                    shard.current_page, on_page=on_page
+                ):
+                    return
+                self.state_manager.update_shard(index, status='done')
+
+            self.state_manager.mark_completed()
+            self.on_completed()
+
+        except Exception as e:
+            self.on_error(e)
+        finally:
+            self.close_scraper()
+            self.state_manager.save_state()
+
+    def run_worker(self, queue: WorkQueue, url: str, scraper_args: dict, worker_id: str = None,
+                   poll_interval: float = 2.0):
+        """Take page and detail work from a shared WorkQueue until it is drained.
+
+        The first worker with a url seeds the queue with the search (or its
+        shards). Page tasks queue their listings as detail tasks and the next
+        page as a page task; detail tasks are only acknowledged after the
+        listing was persisted, so a dying worker's leases are redone by
+        another worker once they expire.
+        """
+        worker_id = worker_id or default_worker_id()
+        keeper = None
+        try:
+            self.initialize_scraper(**scraper_args)
+            if url and queue.is_empty():
+                shards = self.plan_shards(url, scraper_args) if scraper_args.get('shard') else [Shard(url)]
+                queue.enqueue_many('page', ((shard.url, {'page': 1}) for shard in shards))
+            keeper = LeaseKeeper(queue, worker_id)
+            batch_size = max(1, scraper_args.get('concurrency') or 1)
+            self.on_progress(f"Worker {worker_id} started")
+
+            while self.wait_if_paused():
+                tasks = queue.lease(worker_id, batch_size)
+                if not tasks:
+                    if queue.is_drained():
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                keeper.hold(task.id for task in tasks)
+
+                pages = [task for task in tasks if task.kind == 'page']
+                details = [task for task in tasks if task.kind == 'detail']
+                for task in pages:
+                    self._run_page_task(queue, worker_id, task, scraper_args)
+                    keeper.drop(task.id)
+                self._run_detail_tasks(queue, worker_id, details)
+                for task in details:
+                    keeper.drop(task.id)
+
+            if not self.should_stop:
+                self.state_manager.mark_completed()
+                self.on_completed()
+        except Exception as e:
+            self.on_error(e)
+        finally:
+            if keeper:
+                keeper.stop()
+            self.close_scraper()
+            self.state_manager.save_state()
+
+    def _run_page_task(self, queue: WorkQueue, worker_id: str, task, scraper_args: dict):
+        try:
+            page = (task.payload or {}).get('page', 1)
+            # Page tasks of any shard can follow each other, the page count starts at the task's page
+            self.on_shard_started(Shard(task.url, current_page=page))
+            self.on_progress(f"Starting to scrape page {page}: {task.url}")
+            listings = self.scrape_page(task.url)
+            queue.enqueue_many('detail', (
+                (listing.detail_url, asdict(listing)) for listing in listings
+                if not self.state_manager.is_processed(listing.listing_id, listing.detail_url)
+            ))
+            next_url = self.get_next_page(task.url) if page < scraper_args['max_pages'] else ''
+            if next_url:
+                queue.enqueue('page', next_url, {'page': page + 1})
+            queue.ack(worker_id, task.id)
+        except Exception as e:
+            queue.release(worker_id, task.id, str(e))
+            self.on_error(e)
+
+    def _run_detail_tasks(self, queue: WorkQueue, worker_id: str, tasks):
+        leased = {}
+        to_fetch = []
+        for task in tasks:
+            listing = ListingData(**task.payload)
+            details = self.get_cached_details(listing)
+            if details:
+                self._process_listing(listing, details, False)
+                queue.ack(worker_id, task.id)
+            else:
+                leased[listing.listing_id] = task
+                to_fetch.append(listing)
+
+        for listing, details, error in self.iter_details(to_fetch):
+            task = leased.pop(listing.listing_id)
+            if error:
+                queue.release(worker_id, task.id, str(error))
+                self.on_error(error)
+                continue
+            self._process_listing(listing, details)
+            queue.ack(worker_id, task.id)
+
+        # Work left when scraping was stopped goes back to the queue right away
+        for task in leased.values():
+            queue.give_back(worker_id, task.id)
+
+    def _put(self, work: Queue, item) -> bool:
+        """Blocking put that gives up once scraping is stopped"""
+        while not self.should_stop:
+            try:
+                work.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _produce_listings(self, url: str, scraper_args: dict, work: Queue):
+        """Pagination stage, walks results pages and queues detail work"""
+        try:
+            current_page, last_id, _ = self.state_manager.get_resume_info()
+            while url and current_page <= scraper_args['max_pages']:
+                if not self.wait_if_paused():
                     return
 
                 self.on_progress(f"Starting to scrape page {current_page}")
-                
-                try:
-                    listings = self.scrape_page(url)
-                    
-                    if last_id:
-                        listings = [l for l in listings if l.listing_id > last_id]
-                        last_id = None
-                    
-                    for listing in listings:
-                        # Check stop/pause for each listing
-                        while self.paused and not self.should_stop:
-                            time.sleep(0.1)
-                            
-                        if self.should_stop:
-                            self.on_progress("Scraping stopped")
-                            return
-
-                        if listing.detail_url in processed_urls:
-                            self.on_progress(f"Skipping already processed: {listing.listing_id}")
-                            continue
+                listings = self.scrape_page(url)
 
-                        try:
-                            details = self.scrape_detail(listing.detail_url)
-                            listing_data = self.create_listing_data(listing, details)
-                            
-                            self.state_manager.update_progress(
-                                listing.listing_id, 
-                                listing.detail_url
-                            )
-                            self.on_listing_processed(listing_data)
-                            
-                        except Exception as e:
-                            self.on_error(e)
-                            continue
-                            
-                    current_page += 1
-                    self.state_manager.update_page(current_page)
-                    url = self.get_next_page(url)
-                    
-                except Exception as e:
-                    self.on_error(e)
+                if last_id:
+                    listings = [l for l in listings if l.listing_id > last_id]
+                    last_id = None
+
+                for listing in listings:
+                    if not self.wait_if_paused():
+                        return
+                    if self.state_manager.is_processed(listing.listing_id, listing.detail_url):
+                        self.on_progress(f"Skipping already processed: {listing.listing_id}")
+                        continue
+
+                    details = self.get_cached_details(listing)
+                    if details:
+                        future = Future()
+                        future.set_result(details)
+                    else:
+                        future = self.submit_detail(listing)
+                    if not self._put(work, ('listing', (listing, future, details is None))):
+                        future.cancel()
+                        return
+
+                current_page += 1
+                self._put(work, ('page', current_page))
+                url = self.get_next_page(url)
+        except Exception as e:
+            self._put(work, ('error', e))
+        finally:
+            self._put(work, None)
+
+    def start_pipelined_scraping(self, url: str, scraper_args: dict):
+        """Pipelined scraping logic.
+
+        A pagination thread walks results pages and submits detail work
+        through submit_detail into a bounded queue, while this thread writes
+        results in queue order. The queue size bounds how far pagination
+        may run ahead of the writer.
+        """
+        work = Queue(maxsize=scraper_args.get('queue_size') or 50)
+        producer = None
+        finished = False
+        try:
+            self.initialize_scraper(**scraper_args)
+            producer = threading.Thread(
+                target=self._produce_listings,
+                args=(url, scraper_args, work),
+                name='pagination',
+                daemon=True
+            )
+            producer.start()
+
+            while True:
+                if not self.wait_if_paused():
+                    self.on_progress("Scraping stopped")
+                    return
+                try:
+                    item = work.get(timeout=0.1)
+                except Empty:
+                    continue
+                if item is None:
+                    finished = True
                     break
 
+                kind, payload = item
+                if kind == 'page':
+                    self.state_manager.update_page(payload)
+                elif kind == 'error':
+                    self.on_error(payload)
+                else:
+                    listing, future, fetched = payload
+                    try:
+                        details = future.result()
+                    except Exception as e:
+                        self.on_error(e)
+                        continue
+                    self._process_listing(listing, details, fetched)
+
             self.state_manager.mark_completed()
             self.on_completed()
-            
+
         except Exception as e:
             self.on_error(e)
         finally:
+            if not finished:
+                self.should_stop = True
+            # Drop queued work so a stopped producer is not left blocking
+            while True:
+                try:
+                    item = work.get_nowait()
+                except Empty:
+                    break
+                if item and item[0] == 'listing':
+                    item[1][1].cancel()
+            if producer:
+                producer.join()
+            self.close_scraper()
             self.state_manager.save_state()
 
     def pause(self):
@@ -1,16 +1,22 @@
-from .sahibinden_controller import SahibindenScrapeController
+from .sahibinden_controller import SahibindenScrapeController, AsyncSahibindenScrapeController
 from state_manager import StateManager
+from sinks import JSONLSink
+from listing_store import ListingStore
 from config import PATHS
-import json
-import os
+from metrics import registry as metrics
 
 class CLIScrapeController(SahibindenScrapeController):
-    def __init__(self, state_manager: StateManager):
+    def __init__(self, state_manager: StateManager, sink_options: dict = None,
+                 listing_db: str = PATHS['LISTING_DB']):
         super().__init__(state_manager)
-        self.continuous_file = PATHS['CONTINUOUS_DATA']
+        self.continuous_file = PATHS['CONTINUOUS_JSONL']
+        self.sink = JSONLSink(self.continuous_file, **(sink_options or {}))
+        # Queryable copy of every listing, disabled with listing_db=None
+        self.store = ListingStore(listing_db) if listing_db else None
 
     def on_listing_processed(self, listing_data: dict):
         self._save_continuous_json(listing_data)
+        self._save_to_store(listing_data)
         self.logger.info(f"Processed listing: {listing_data['listing']['listing_id']}")
 
     def on_error(self, error: Exception):
@@ -24,18 +30,29 @@ class CLIScrapeController(SahibindenScrapeController):
         self.logger.info("Scraping completed successfully")
         super().on_completed()
 
+    def close_scraper(self):
+        super().close_scraper()
+        self.sink.close()
+        if self.store:
+            self.store.close()
+
     def _save_continuous_json(self, listing_data: dict):
-        mode = 'a' if os.path.exists(self.continuous_file) else 'w'
         try:
-            with open(self.continuous_file, mode, encoding='utf-8') as f:
-                if mode == 'w':
-                    f.write('[\n')
-                else:
-                    f.seek(0, 2)
-                    f.seek(f.tell() - 2, 0)
-                    f.write(',\n')
-                
-                json.dump(listing_data, f, ensure_ascii=False, indent=2)
-                f.write('\n]')
+            with metrics.timer('sink_write'):
+                self.sink.write(listing_data)
         except Exception as e:
             self.logger.error(f"Error saving continuous data: {e}")
+
+    def _save_to_store(self, listing_data: dict):
+        if not self.store:
+            return
+        try:
+            with metrics.timer('store_write'):
+                self.store.add(listing_data)
+        except Exception as e:
+            self.logger.error(f"Error saving listing to store: {e}")
+
+
+class AsyncCLIScrapeController(AsyncSahibindenScrapeController, CLIScrapeController):
+    """CLIScrapeController running on asyncio, see AsyncScrapeController"""
+    pass
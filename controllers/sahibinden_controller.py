@@ -1,15 +1,54 @@
 from .base_controller import BaseScrapeController
+from .async_controller import AsyncScrapeController
 from scraper import SahibindenScraper
+from tab_pool import TabPool
+from fingerprints import FingerprintIndex
+from config import PATHS
+from network import DEFAULT_BLOCKED_TYPES
+from normalization import normalize_details
+from shard_planner import ShardPlanner, PAGINATION_CAP
+from metrics import MetricsPublisher
+from rate_limiter import DEFAULT_MAX_RATE
 from dataclasses import asdict
+from datetime import datetime
 from typing import Tuple, Any
+import asyncio
 
 class SahibindenScrapeController(BaseScrapeController):
+    tab_pool = None
+    fingerprints = None
+    metrics_publisher = None
+
     def initialize_scraper(self, **kwargs):
         self.scraper = SahibindenScraper(
             max_pages=kwargs.get('max_pages', 1),
             delay=kwargs.get('delay', 1.5),
-            headless=kwargs.get('headless', False)
+            headless=kwargs.get('headless', False),
+            block_resources=kwargs.get('block_resources', DEFAULT_BLOCKED_TYPES),
+            block_patterns=kwargs.get('block_patterns'),
+            http_details=kwargs.get('http_details', False),
+            max_rate=kwargs.get('max_rate') or DEFAULT_MAX_RATE
         )
+        concurrency = kwargs.get('concurrency', 1)
+        # Pipelining needs detail tabs separate from the results page tab
+        if concurrency > 1 or kwargs.get('pipeline'):
+            self.tab_pool = TabPool(self.scraper, concurrency)
+        if kwargs.get('skip_unchanged'):
+            self.fingerprints = FingerprintIndex(kwargs.get('fingerprint_db') or PATHS['FINGERPRINTS'])
+        publish = kwargs.get('metrics_port') is not None or kwargs.get('metrics_file')
+        if publish and not self.metrics_publisher:
+            self.metrics_publisher = MetricsPublisher(
+                port=kwargs.get('metrics_port'),
+                snapshot_file=kwargs.get('metrics_file')
+            )
+
+    def plan_shards(self, url: str, scraper_args: dict):
+        planner = ShardPlanner(self.scraper.count_results, cap=scraper_args.get('shard_cap') or PAGINATION_CAP)
+        return planner.plan(url)
+
+    def on_shard_started(self, shard):
+        # max_pages counts per shard
+        self.scraper.page_idx = shard.current_page
 
     def scrape_page(self, url: str):
         return self.scraper.scrape_listing_page(url)
@@ -17,14 +56,99 @@ class SahibindenScrapeController(BaseScrapeController):
     def scrape_detail(self, url: str) -> Tuple[Any, Any]:
         return self.scraper.scrape_detail_page(url)
 
+    def iter_details(self, listings):
+        if not self.tab_pool:
+            yield from super().iter_details(listings)
+            return
+        yield from self.tab_pool.map(
+            listings,
+            lambda listing: listing.detail_url,
+            self.wait_if_paused
+        )
+
+    def get_cached_details(self, listing):
+        if self.fingerprints:
+            return self.fingerprints.lookup(listing)
+        return None
+
+    def on_details_fetched(self, listing, details):
+        if self.fingerprints:
+            self.fingerprints.store(listing, details)
+
+    def close_scraper(self):
+        if self.tab_pool:
+            self.tab_pool.close()
+            self.tab_pool = None
+        if self.fingerprints:
+            self.logger.info(
+                f"Change detection reused {self.fingerprints.hits} listings, "
+                f"fetched {self.fingerprints.misses}"
+            )
+            self.fingerprints.close()
+            self.fingerprints = None
+        if self.metrics_publisher:
+            self.metrics_publisher.close()
+            self.metrics_publisher = None
+
+    def submit_detail(self, listing):
+        if not self.tab_pool:
+            return super().submit_detail(listing)
+        return self.tab_pool.submit(listing.detail_url, self.wait_if_paused)
+
     def get_next_page(self, url: str) -> str:
-        return self.scraper.next_page(url)
+        # Detail tabs leave the results page loaded, no need to reload it
+        return self.scraper.next_page(None if self.tab_pool else url)
 
     def create_listing_data(self, listing, details) -> dict:
         property_details, contact_info = details
         return {
             "data_source": "Sahibinden",
+            "scraped_at": datetime.now().isoformat(),
             "listing": asdict(listing),
             "property_details": asdict(property_details),
-            "contact_info": asdict(contact_info)
-        }
\ No newline at end of file
+            "contact_info": asdict(contact_info),
+            "normalized": normalize_details(listing, property_details)
+        }
+
+
+class AsyncSahibindenScrapeController(AsyncScrapeController, SahibindenScrapeController):
+    """Sahibinden crawl on one event loop, detail pages load in several tabs at once.
+
+    Every tab is a CDP target driven by coroutines of the scraper, so
+    overlapping page loads need no thread per tab.
+    """
+    detail_tabs = None
+    _free_tabs = None
+
+    def initialize_scraper(self, **kwargs):
+        # Detail tabs are driven from the loop instead of a TabPool
+        super().initialize_scraper(**{**kwargs, 'concurrency': 1, 'pipeline': False})
+        self.detail_tabs = [self.scraper.open_tab() for _ in range(max(1, kwargs.get('concurrency') or 1))]
+        self._free_tabs = None
+
+    async def scrape_page_async(self, url: str):
+        return await self.scraper.scrape_listing_page_async(url)
+
+    async def scrape_detail_async(self, url: str):
+        if self._free_tabs is None:
+            self._free_tabs = asyncio.Queue()
+            for tab in self.detail_tabs:
+                self._free_tabs.put_nowait(tab)
+        tab = await self._free_tabs.get()
+        try:
+            return await tab.scrape_detail_page_async(url)
+        finally:
+            self._free_tabs.put_nowait(tab)
+
+    async def get_next_page_async(self, url: str) -> str:
+        # Details load in their own tabs, the results page is still open
+        return self.scraper.next_page(None)
+
+    def close_scraper(self):
+        for tab in self.detail_tabs or []:
+            try:
+                tab.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close tab: {e}")
+        self.detail_tabs = None
+        super().close_scraper()
@@ -0,0 +1,196 @@
+from typing import Dict, Optional, Tuple
+from models import PropertyDetails, ContactInfo
+from normalization import parse_area
+from listing_parser import has_class
+import re
+
+try:
+    from lxml import html as lxml_html
+    from lxml.etree import XPath, tostring
+except ImportError:
+    lxml_html = None
+
+# Collects everything scrape_detail_page needs in a single evaluation
+DETAIL_SCRIPT = r"""
+const text = el => el ? el.innerText.trim() : '';
+const details = {};
+const infoList = document.querySelector('[class*="classifiedInfoList"]');
+if (infoList) {
+    for (const li of infoList.querySelectorAll('li')) {
+        const strong = li.querySelector('strong');
+        const span = li.querySelector('span');
+        if (strong && span) {
+            details[text(strong).replace(/^:+|:+$/g, '')] = span.innerText;
+        }
+    }
+}
+const description = document.querySelector('[id*="classifiedDescription"]');
+
+let store = null;
+const storeInfo = document.querySelector('.classifiedOtherBoxes .user-info-module');
+if (storeInfo) {
+    const phones = {};
+    for (const group of storeInfo.querySelectorAll('[class*="dl-group"]')) {
+        const dt = group.querySelector('dt');
+        const dd = group.querySelector('dd');
+        if (dt && dd && !(text(dt) in phones)) {
+            phones[text(dt)] = text(dd);
+        }
+    }
+    store = {
+        agency_name: text(document.querySelector('.user-info-store-name')),
+        agent_name: text(document.querySelector('.user-info-agent h3')),
+        phones: phones
+    };
+}
+
+const nameHeader = document.querySelector('[class*="sticky-header-store-information-text"]');
+const phoneSpan = document.querySelector('span.pretty-phone-part.show-part span');
+return {
+    details: details,
+    description: description ? description.innerHTML : '',
+    store: store,
+    individual: {
+        name_html: nameHeader ? nameHeader.innerHTML : '',
+        phone: phoneSpan ? (phoneSpan.getAttribute('data-content') || '') : ''
+    }
+};
+"""
+
+OBFUSCATED_CLASS = re.compile(r'<span class="(css[a-f0-9\-]+)"')
+OBFUSCATED_CONTENT = re.compile(r"<style>\.(css[a-f0-9\-]+):before {content: '([^']+)';}</style>")
+
+
+def decode_obfuscated_name(name_html: str) -> str:
+    """Recover a seller name hidden in a CSS :before rule"""
+    css_class = OBFUSCATED_CLASS.search(name_html or '')
+    if not css_class:
+        return ''
+    for class_name, content in OBFUSCATED_CONTENT.findall(name_html):
+        if class_name == css_class.group(1):
+            return content
+    return ''
+
+
+def build_property_details(details: Dict[str, str], description: str) -> PropertyDetails:
+    """Convert the label -> value map of classifiedInfoList to PropertyDetails"""
+    return PropertyDetails(
+        gross_area=parse_area(details.get('m² (Brüt)')) or 0.0,
+        net_area=parse_area(details.get('m² (Net)')) or 0.0,
+        room_count=details.get('Oda Sayısı', '').strip(),
+        building_age=details.get('Bina Yaşı', '').strip(),
+        floor=details.get('Bulunduğu Kat', '').strip(),
+        total_floors=int(details.get('Kat Sayısı', '0').strip()),
+        heating=details.get('Isıtma', '').strip(),
+        bathroom_count=int(details.get('Banyo Sayısı', '0').strip()),
+        balcony='Var' in details.get('Balkon', '').strip(),
+        elevator='Var' in details.get('Asansör', '').strip(),
+        parking=details.get('Otopark', '').strip(),
+        furnished='Var' in details.get('Eşyalı', '').strip(),
+        usage_status=details.get('Kullanım Durumu', '').strip(),
+        in_complex='Var' in details.get('Site İçerisinde', '').strip(),
+        maintenance_fee=details.get('Aidat', '').strip(),
+        credit_eligible='Var' in details.get('Krediye Uygun', '').strip(),
+        deed_status=details.get('Tapu Durumu', '').strip(),
+        listed_by=details.get('Kimden', '').strip(),
+        exchangeable='Var' in details.get('Takas', '').strip(),
+        description=(description or '').strip()
+    )
+
+
+def build_contact_info(store: Optional[dict], individual: dict) -> ContactInfo:
+    """Convert the store/individual seller blocks to ContactInfo"""
+    if store:
+        phones = store.get('phones') or {}
+        return ContactInfo(
+            agency_name=store.get('agency_name', ''),
+            agent_name=store.get('agent_name', ''),
+            office_phone=phones.get('İş', ''),
+            mobile_phone=phones.get('Cep', '')
+        )
+    return ContactInfo(
+        agency_name='',
+        agent_name=decode_obfuscated_name(individual.get('name_html', '')),
+        office_phone='',
+        mobile_phone=individual.get('phone', '')
+    )
+
+
+def extract_detail(page) -> Tuple[PropertyDetails, ContactInfo]:
+    """Extract details and contact info with one script evaluation"""
+    data = page.run_js(DETAIL_SCRIPT)
+    if not isinstance(data, dict):
+        raise ValueError("Detail script returned no data")
+    return (
+        build_property_details(data.get('details') or {}, data.get('description', '')),
+        build_contact_info(data.get('store'), data.get('individual') or {})
+    )
+
+
+if lxml_html is not None:
+    # XPath versions of the selectors in DETAIL_SCRIPT
+    INFO_ITEMS = XPath("(//*[contains(@class, 'classifiedInfoList')])[1]//li")
+    DESCRIPTION = XPath("//*[contains(@id, 'classifiedDescription')]")
+    STORE_INFO = XPath(f"//*[{has_class('classifiedOtherBoxes')}]//*[{has_class('user-info-module')}]")
+    STORE_NAME = XPath(f"//*[{has_class('user-info-store-name')}]")
+    AGENT_NAME = XPath(f"//*[{has_class('user-info-agent')}]//h3")
+    PHONE_GROUPS = XPath(".//*[contains(@class, 'dl-group')]")
+    NAME_HEADER = XPath("//*[contains(@class, 'sticky-header-store-information-text')]")
+    PHONE_SPAN = XPath(f"//span[{has_class('pretty-phone-part')} and {has_class('show-part')}]//span/@data-content")
+
+
+def _text(elements) -> str:
+    return elements[0].text_content().strip() if elements else ''
+
+
+def _inner_html(elements) -> str:
+    if not elements:
+        return ''
+    element = elements[0]
+    return (element.text or '') + ''.join(tostring(child, encoding='unicode') for child in element)
+
+
+def parse_detail_html(page_html: str) -> Tuple[PropertyDetails, ContactInfo]:
+    """Extract details and contact info from a detail page HTML string.
+
+    Counterpart of extract_detail for pages fetched without the browser.
+    Raises ValueError if the page has no classifiedInfoList, e.g. when a
+    challenge or login page came back instead.
+    """
+    if lxml_html is None:
+        raise RuntimeError("lxml is required to parse detail pages outside the browser")
+
+    tree = lxml_html.fromstring(page_html)
+    items = INFO_ITEMS(tree)
+    if not items:
+        raise ValueError("Detail page has no classifiedInfoList")
+
+    details = {}
+    for item in items:
+        strong, span = item.find('.//strong'), item.find('.//span')
+        if strong is not None and span is not None:
+            details[strong.text_content().strip().strip(':')] = span.text_content()
+
+    store = None
+    store_info = STORE_INFO(tree)
+    if store_info:
+        phones = {}
+        for group in PHONE_GROUPS(store_info[0]):
+            dt, dd = group.find('.//dt'), group.find('.//dd')
+            if dt is not None and dd is not None:
+                phones.setdefault(dt.text_content().strip(), dd.text_content().strip())
+        store = {
+            'agency_name': _text(STORE_NAME(tree)),
+            'agent_name': _text(AGENT_NAME(tree)),
+            'phones': phones
+        }
+
+    phone = PHONE_SPAN(tree)
+    individual = {
+        'name_html': _inner_html(NAME_HEADER(tree)),
+        'phone': phone[0] if phone else ''
+    }
+    return (
+        build_property_details(details, _inner_html(DESCRIPTION(tree))),
+        build_contact_info(store, individual)
+    )
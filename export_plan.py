@@ -0,0 +1,168 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from exporters import BaseExporter, RecordStream, compile_fields, project
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+
+# Rows sent to a parallel writer per queue message
+BATCH_SIZE = 500
+QUEUE_BATCHES = 8
+
+
+def _drain(exporter: BaseExporter, output_path: str, batches):
+    """Writer loop shared by thread and process workers"""
+    exporter.open(output_path)
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            for row, item in batch:
+                exporter.write(row, item)
+    finally:
+        exporter.close()
+
+
+def _process_writer(exporter_cls, fields, options, output_path, batches, errors):
+    try:
+        _drain(exporter_cls([], fields, **options), output_path, batches)
+    except Exception as e:
+        errors.put(f"{exporter_cls.__name__}: {e}")
+        # Keep consuming so the reader never blocks on a dead writer
+        while batches.get() is not None:
+            pass
+
+
+class ExportPlan:
+    """Exports one dataset to several targets with a single read.
+
+    The field list is compiled into accessors once, every record is read and
+    projected once, then fanned out to all writers. Writers run inline, or
+    in their own threads/processes with parallel='thread' / 'process'.
+    """
+    def __init__(self, data: Iterable[Dict[str, Any]], fields: List[str], parallel: Optional[str] = None):
+        if parallel not in (None, 'thread', 'process'):
+            raise ValueError(f"Unknown parallel mode: {parallel}")
+        self.data = data
+        self.fields = fields
+        self.accessors = compile_fields(fields)
+        self.parallel = parallel
+        self.targets: List[Tuple[Type[BaseExporter], str, dict]] = []
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_json(cls, json_file: str, fields: List[str], parallel: Optional[str] = None):
+        return cls(RecordStream(json_file), fields, parallel)
+
+    def add_target(self, exporter_cls: Type[BaseExporter], output_path: str, **options):
+        self.targets.append((exporter_cls, output_path, options))
+        return self
+
+    def _records(self):
+        records = iter(self.data)
+        first = next(records, None)
+        if first is None:
+            return None
+        return itertools.chain([first], records)
+
+    def execute(self) -> int:
+        """Run the export, returns the number of records written"""
+        records = self._records()
+        if records is None or not self.targets:
+            return 0
+        if self.parallel:
+            return self._execute_parallel(records)
+
+        exporters = [
+            (exporter_cls(None, self.fields, **options), output_path)
+            for exporter_cls, output_path, options in self.targets
+        ]
+        opened = []
+        count = 0
+        try:
+            for exporter, output_path in exporters:
+                exporter.open(output_path)
+                opened.append(exporter)
+            for item in records:
+                row = project(item, self.accessors)
+                for exporter in opened:
+                    exporter.write(row, item)
+                count += 1
+        finally:
+            for exporter in opened:
+                exporter.close()
+        return count
+
+    def _execute_parallel(self, records) -> int:
+        if self.parallel == 'process':
+            context = multiprocessing.get_context('spawn')
+            make_queue = lambda: context.Queue(QUEUE_BATCHES)
+            errors = context.Queue()
+        else:
+            make_queue = lambda: queue.Queue(QUEUE_BATCHES)
+            errors = queue.Queue()
+
+        workers = []
+        for exporter_cls, output_path, options in self.targets:
+            batches = make_queue()
+            # Only partitioned writers need the full record next to the row
+            needs_item = bool(options.get('partition_by'))
+            if self.parallel == 'process':
+                worker = context.Process(
+                    target=_process_writer,
+                    args=(exporter_cls, self.fields, options, output_path, batches, errors)
+                )
+            else:
+                exporter = exporter_cls(None, self.fields, **options)
+                worker = threading.Thread(
+                    target=self._thread_writer,
+                    args=(exporter, output_path, batches, errors)
+                )
+            worker.start()
+            workers.append((worker, batches, needs_item))
+
+        count = 0
+        batch = []
+        try:
+            for item in records:
+                batch.append((project(item, self.accessors), item))
+                count += 1
+                if len(batch) >= BATCH_SIZE:
+                    self._fan_out(workers, batch)
+                    batch = []
+            if batch:
+                self._fan_out(workers, batch)
+        finally:
+            for _, batches, _ in workers:
+                batches.put(None)
+            for worker, _, _ in workers:
+                worker.join()
+
+        failures = []
+        while not errors.empty():
+            failures.append(errors.get())
+        if failures:
+            raise RuntimeError(f"Export failed: {'; '.join(failures)}")
+        return count
+
+    @staticmethod
+    def _fan_out(workers, batch):
+        rows_only = None
+        for _, batches, needs_item in workers:
+            if needs_item:
+                batches.put(batch)
+            else:
+                if rows_only is None:
+                    rows_only = [(row, None) for row, _ in batch]
+                batches.put(rows_only)
+
+    @staticmethod
+    def _thread_writer(exporter, output_path, batches, errors):
+        try:
+            _drain(exporter, output_path, batches)
+        except Exception as e:
+            errors.put(f"{type(exporter).__name__}: {e}")
+            while batches.get() is not None:
+                pass
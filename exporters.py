@@ -1,69 +1,281 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 import csv
+import itertools
 import json
-import pandas as pd
+import os
+import textwrap
+import dataclasses
+import re
+from datetime import date, datetime
+from openpyxl import Workbook
+from models import ListingData, PropertyDetails, ContactInfo, NormalizedListing
+from sinks import iter_jsonl
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 from dataclasses import asdict
 
+def compile_fields(fields: List[str]) -> List[Tuple[str, Tuple[str, ...]]]:
+    """Split dotted field paths once (e.g. "listing.id" -> ("listing", "id"))"""
+    return [(field, tuple(field.split('.'))) for field in fields]
+
+def project(item: Dict[str, Any], accessors: List[Tuple[str, Tuple[str, ...]]]) -> Dict[str, Any]:
+    """Pick the compiled field paths out of a nested record"""
+    result = {}
+    for field, parts in accessors:
+        value = item
+        for part in parts:
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                value = None
+                break
+        result[field] = value
+    return result
+
 class BaseExporter(ABC):
-    def __init__(self, data: List[Dict[str, Any]], fields: List[str]):
+    """Exporters write projected rows incrementally through open/write/close"""
+    def __init__(self, data: Iterable[Dict[str, Any]], fields: List[str]):
         self.data = data
         self.fields = fields
+        self.accessors = compile_fields(fields)
     
     @classmethod
-    def from_json(cls, json_file: str, fields: List[str]):
-        """Create exporter instance from JSON file"""
-        data = SahibindenJSONImporter.import_file(json_file)
-        return cls(data, fields)
+    def from_json(cls, json_file: str, fields: List[str], **kwargs):
+        """Create exporter instance streaming from a JSON or JSONL file"""
+        return cls(RecordStream(json_file), fields, **kwargs)
         
     def _extract_fields(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        result = {}
-        for field in self.fields:
-            # Split nested field paths (e.g., "listing.id" -> ["listing", "id"])
-            parts = field.split('.')
-            value = item
-            for part in parts:
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    value = None
-                    break
-            result[field] = value
-        return result
+        return project(item, self.accessors)
 
     @abstractmethod
-    def export(self, output_path: str):
+    def open(self, output_path: str):
+        pass
+
+    @abstractmethod
+    def write(self, row: Dict[str, Any], item: Dict[str, Any]):
+        """Write one projected row, item is the full source record"""
+        pass
+
+    @abstractmethod
+    def close(self):
         pass
 
-class CSVExporter(BaseExporter):
     def export(self, output_path: str):
-        if not self.data:
+        records = iter(self.data)
+        first = next(records, None)
+        if first is None:
             return
-            
-        extracted_data = [self._extract_fields(item) for item in self.data]
-        
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fields)
-            writer.writeheader()
-            writer.writerows(extracted_data)
+
+        self.open(output_path)
+        try:
+            for item in itertools.chain([first], records):
+                self.write(self._extract_fields(item), item)
+        finally:
+            self.close()
+
+class CSVExporter(BaseExporter):
+    def open(self, output_path: str):
+        self.file = open(output_path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fields)
+        self.writer.writeheader()
+
+    def write(self, row: Dict[str, Any], item: Dict[str, Any]):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
 
 class ExcelExporter(BaseExporter):
-    def export(self, output_path: str):
-        if not self.data:
-            return
-            
-        extracted_data = [self._extract_fields(item) for item in self.data]
-        df = pd.DataFrame(extracted_data)
-        df.to_excel(output_path, index=False)
+    def open(self, output_path: str):
+        # Write-only workbooks flush rows to disk instead of keeping cells in memory
+        self.output_path = output_path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append(self.fields)
+
+    def write(self, row: Dict[str, Any], item: Dict[str, Any]):
+        self.sheet.append([row[field] for field in self.fields])
+
+    def close(self):
+        self.workbook.save(self.output_path)
 
 class JSONExporter(BaseExporter):
-    def export(self, output_path: str):
-        if not self.data:
-            return
-            
-        extracted_data = [self._extract_fields(item) for item in self.data]
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(extracted_data, f, ensure_ascii=False, indent=2)
+    def open(self, output_path: str):
+        self.file = open(output_path, 'w', encoding='utf-8')
+        self.file.write('[\n')
+        self.count = 0
+
+    def write(self, row: Dict[str, Any], item: Dict[str, Any]):
+        if self.count:
+            self.file.write(',\n')
+        self.file.write(textwrap.indent(json.dumps(row, ensure_ascii=False, indent=2), '  '))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n]')
+        self.file.close()
+
+PYTHON_TO_ARROW = {
+    str: 'string',
+    int: 'int64',
+    float: 'float64',
+    bool: 'bool_',
+}
+
+UNSAFE_PATH_CHARS = re.compile(r'[\\/=]')
+
+MODEL_SECTIONS = {
+    'listing': ListingData,
+    'property_details': PropertyDetails,
+    'contact_info': ContactInfo,
+    'normalized': NormalizedListing,
+}
+
+def _unwrap_optional(field_type):
+    """Optional[X] -> X"""
+    args = [arg for arg in getattr(field_type, '__args__', ()) if arg is not type(None)]
+    return args[0] if len(args) == 1 else field_type
+
+def model_field_types() -> Dict[str, type]:
+    """Python type of every exportable field, derived from the model dataclasses"""
+    types = {'scraped_at': datetime}
+    for section, model in MODEL_SECTIONS.items():
+        for model_field in dataclasses.fields(model):
+            types[f'{section}.{model_field.name}'] = _unwrap_optional(model_field.type)
+    return types
+
+def arrow_schema(fields: List[str]):
+    """Arrow schema for the selected fields, typed from models.py"""
+    types = model_field_types()
+    columns = []
+    for field in fields:
+        field_type = types.get(field, str)
+        if field_type is datetime:
+            columns.append(pa.field(field, pa.timestamp('us')))
+        elif field_type is date:
+            columns.append(pa.field(field, pa.date32()))
+        else:
+            columns.append(pa.field(field, getattr(pa, PYTHON_TO_ARROW.get(field_type, 'string'))()))
+    return pa.schema(columns)
+
+def _coerce(value, field_type):
+    """Convert a JSON value to the column type, None if it does not fit"""
+    if value is None or value == '':
+        return None
+    try:
+        if field_type is datetime:
+            return datetime.fromisoformat(value) if isinstance(value, str) else value
+        if field_type is date:
+            return date.fromisoformat(value[:10]) if isinstance(value, str) else value
+        if field_type is bool:
+            return bool(value)
+        if field_type in (int, float):
+            return field_type(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+class ParquetExporter(BaseExporter):
+    """Writes typed, optionally hive-partitioned Parquet.
+
+    Without partition_by the output is a single file; with it output_path
+    is a directory of 'scrape_date=.../location=.../part-N.parquet' files.
+    Rows are buffered and written in row groups of row_group_size. At most
+    max_buffered_rows are held across all partitions, the largest buffers
+    are flushed first when over it, and at most max_open_files writers stay
+    open; a partition whose writer was closed continues in a new part file.
+    """
+    PARTITIONS = {
+        'scrape_date': lambda item: (item.get('scraped_at') or 'unknown')[:10],
+        'location': lambda item: ((item.get('listing') or {}).get('location') or 'unknown').split(' ')[0],
+    }
+
+    def __init__(self, data: Iterable[Dict[str, Any]], fields: List[str],
+                 partition_by: List[str] = None, row_group_size: int = 50000,
+                 max_buffered_rows: int = None, max_open_files: int = 32):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet export")
+        super().__init__(data, fields)
+        for partition in partition_by or ():
+            if partition not in self.PARTITIONS:
+                raise ValueError(f"Unknown partition: {partition}")
+        self.partition_by = partition_by or []
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows or row_group_size
+        self.max_open_files = max(1, max_open_files)
+        self.schema = arrow_schema(fields)
+        self.types = model_field_types()
+
+    def _partition_path(self, output_path: str, item: Dict[str, Any]) -> str:
+        if not self.partition_by:
+            return output_path
+        parts = [
+            f"{name}={UNSAFE_PATH_CHARS.sub('_', self.PARTITIONS[name](item))}"
+            for name in self.partition_by
+        ]
+        return os.path.join(output_path, *parts)
+
+    def _writer(self, path: str):
+        """Open writer of a partition, closing the least recently used one when too many are open"""
+        writer = self.writers.pop(path, None)
+        if writer is None:
+            if len(self.writers) >= self.max_open_files:
+                self.writers.pop(next(iter(self.writers))).close()
+            file_path = path
+            if self.partition_by:
+                os.makedirs(path, exist_ok=True)
+                part = self.parts.get(path, 0)
+                self.parts[path] = part + 1
+                file_path = os.path.join(path, f'part-{part}.parquet')
+            writer = pq.ParquetWriter(file_path, self.schema)
+        # Dicts keep insertion order, the first writer is the least recently used
+        self.writers[path] = writer
+        return writer
+
+    def _flush(self, path: str, rows: List[Dict[str, Any]]):
+        columns = {
+            field: [_coerce(row[field], self.types.get(field, str)) for row in rows]
+            for field in self.fields
+        }
+        self._writer(path).write_table(pa.table(columns, schema=self.schema), row_group_size=self.row_group_size)
+        self.buffered -= len(rows)
+        rows.clear()
+
+    def open(self, output_path: str):
+        self.output_path = output_path
+        self.buffers = {}
+        self.writers = {}
+        self.parts = {}
+        self.buffered = 0
+
+    def write(self, row: Dict[str, Any], item: Dict[str, Any]):
+        path = self._partition_path(self.output_path, item)
+        rows = self.buffers.setdefault(path, [])
+        rows.append(row)
+        self.buffered += 1
+        if len(rows) >= self.row_group_size:
+            self._flush(path, rows)
+        elif self.buffered > self.max_buffered_rows:
+            # Many small partitions, free half the budget starting with the largest buffers
+            for other, pending in sorted(self.buffers.items(), key=lambda entry: -len(entry[1])):
+                if self.buffered <= self.max_buffered_rows // 2:
+                    break
+                self._flush(other, pending)
+            self.buffers = {other: pending for other, pending in self.buffers.items() if pending}
+
+    def close(self):
+        try:
+            for path, rows in self.buffers.items():
+                if rows:
+                    self._flush(path, rows)
+        finally:
+            for writer in self.writers.values():
+                writer.close()
 
 class SahibindenValidator:
     """Validates if the JSON data has Sahibinden source identifier"""
@@ -76,13 +288,70 @@ class SahibindenValidator:
         first_item = data[0]
         return first_item.get('data_source') == 'Sahibinden'
 
+# Whitespace and commas between the items of a JSON array
+ITEM_SEPARATOR = re.compile(r'[\s,]*')
+
+def iter_json_array(file_path: str, chunk_size: int = 1024 * 1024) -> Iterator[Dict]:
+    """Yield the items of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError("Expected a JSON array")
+        # Items are decoded in place, the buffer is only cut when it is refilled
+        idx = 1
+        eof = False
+        while True:
+            idx = ITEM_SEPARATOR.match(buffer, idx).end()
+            if buffer.startswith(']', idx):
+                return
+            try:
+                item, idx = decoder.raw_decode(buffer, idx)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[idx:] + chunk
+                idx = 0
+                continue
+            yield item
+
+class RecordStream:
+    """Re-iterable stream of validated records from a data file"""
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def __iter__(self) -> Iterator[Dict]:
+        return SahibindenJSONImporter.iter_file(self.file_path)
+
 class SahibindenJSONImporter:
     """Imports JSON data and validates it follows Sahibinden format"""
+    @staticmethod
+    def is_jsonl(file_path: str) -> bool:
+        return '.jsonl' in os.path.basename(file_path)
+
+    @staticmethod
+    def iter_file(file_path: str) -> Iterator[Dict]:
+        """Stream records one at a time, validating the first one"""
+        if SahibindenJSONImporter.is_jsonl(file_path):
+            records = iter_jsonl(file_path)
+        else:
+            records = iter_json_array(file_path)
+        for index, record in enumerate(records):
+            if index == 0 and not SahibindenValidator.validate([record]):
+                raise ValueError("Not a valid Sahibinden data source")
+            yield record
+
     @staticmethod
     def import_file(file_path: str) -> List[Dict]:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if SahibindenJSONImporter.is_jsonl(file_path):
+                # Single segment or base path of a segmented JSONL sink
+                data = list(iter_jsonl(file_path))
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
                 
             if not SahibindenValidator.validate(data):
                 raise ValueError("Not a valid Sahibinden data source")
@@ -94,6 +363,8 @@ class SahibindenJSONImporter:
 def get_available_fields() -> List[str]:
     """Returns list of all available fields that can be exported"""
     return [
+        'scraped_at',
+
         # Listing fields
         'listing.listing_id',
         'listing.title',
@@ -131,5 +402,21 @@ def get_available_fields() -> List[str]:
         'contact_info.agency_name',
         'contact_info.agent_name',
         'contact_info.office_phone',
-        'contact_info.mobile_phone'
+        'contact_info.mobile_phone',
+
+        # Normalized fields
+        'normalized.price',
+        'normalized.currency',
+        'normalized.listing_date',
+        'normalized.size_m2',
+        'normalized.gross_area',
+        'normalized.net_area',
+        'normalized.rooms',
+        'normalized.living_rooms',
+        'normalized.building_age_min',
+        'normalized.building_age_max',
+        'normalized.floor_number',
+        'normalized.floor_category',
+        'normalized.maintenance_fee',
+        'normalized.price_per_m2'
     ]
@@ -0,0 +1,91 @@
+from dataclasses import asdict
+from typing import Optional, Tuple
+from models import ListingData, PropertyDetails, ContactInfo
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Row fields that signal a listing changed on the results page
+FINGERPRINT_FIELDS = ('title', 'size_m2', 'room_count', 'price', 'date', 'location')
+
+
+def fingerprint(listing: ListingData) -> str:
+    """Stable hash of the results page row of a listing"""
+    values = [str(getattr(listing, field)) for field in FINGERPRINT_FIELDS]
+    return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()
+
+
+class FingerprintIndex:
+    """Persistent listing_id -> row fingerprint index with the last fetched details.
+
+    Lets repeat crawls skip detail pages of listings whose results page row
+    did not change since the previous run. Stores are committed every
+    batch_size rows or commit_interval seconds.
+    """
+    def __init__(self, db_file: str, batch_size: int = 200, commit_interval: float = 5.0):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                listing_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                property_details TEXT NOT NULL,
+                contact_info TEXT NOT NULL,
+                updated_at REAL
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, listing: ListingData) -> Optional[Tuple[PropertyDetails, ContactInfo]]:
+        """Stored details if the listing is known and its row is unchanged"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT fingerprint, property_details, contact_info FROM fingerprints WHERE listing_id = ?",
+                (listing.listing_id,)
+            ).fetchone()
+        if not row or row[0] != fingerprint(listing):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return PropertyDetails(**json.loads(row[1])), ContactInfo(**json.loads(row[2]))
+
+    def store(self, listing: ListingData, details: Tuple[PropertyDetails, ContactInfo]):
+        property_details, contact_info = details
+        if property_details is None or contact_info is None:
+            return
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?)",
+                (
+                    listing.listing_id,
+                    fingerprint(listing),
+                    json.dumps(asdict(property_details), ensure_ascii=False),
+                    json.dumps(asdict(contact_info), ensure_ascii=False),
+                    time.time()
+                )
+            )
+            self._pending += 1
+        if (self._pending >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self.commit()
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        self.commit()
+        with self._lock:
+            self.conn.close()
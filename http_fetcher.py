@@ -0,0 +1,97 @@
+from typing import Optional
+from urllib.parse import urlsplit
+from CloudflareBypasser import CHALLENGE_TITLE
+from request_manager import RequestProps
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Statuses the site answers with when it wants the browser challenge solved
+CHALLENGE_STATUSES = (403, 429, 503)
+FETCH_TIMEOUT = 15
+
+
+class HTTPFetcher:
+    """Fetches pages over plain HTTP with the cookies of a browser session.
+
+    After the browser has passed the challenge, load_from(page) copies its
+    cookies and user agent into a pooled keep-alive session. fetch() returns
+    None whenever the response looks like a challenge; the fetcher then stays
+    disabled until the browser has been through the site again and
+    load_from() hands over fresh cookies. Shared by the tab scrapers.
+    """
+    def __init__(self, pool_size: int = 10, retries: int = 2, timeout: float = FETCH_TIMEOUT):
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self.session = requests.Session()
+        # Connection errors and 5xx other than challenges are retried here,
+        # challenge statuses go straight back to the browser
+        retry = Retry(
+            total=retries, connect=retries, read=retries, backoff_factor=0.5,
+            status_forcelist=(500, 502, 504), allowed_methods=('GET',)
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def load_from(self, page) -> bool:
+        """Copy cookies and user agent from a browser page that passed the challenge"""
+        try:
+            cookies = page.cookies(all_domains=False, all_info=True)
+            user_agent = page.user_agent
+        except Exception as e:
+            self.logger.warning(f"Could not export browser cookies: {e}")
+            return False
+
+        host = urlsplit(page.url).hostname or ''
+        with self._lock:
+            self.session.cookies.clear()
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain') or host,
+                    path=cookie.get('path') or '/'
+                )
+            self.session.headers.clear()
+            self.session.headers.update(RequestProps.HEADERS[0])
+            self.session.headers['User-Agent'] = user_agent
+            self.ready = True
+        self.logger.debug(f"Loaded {len(cookies)} browser cookies into the HTTP session")
+        return True
+
+    def invalidate(self):
+        with self._lock:
+            self.ready = False
+
+    def _is_challenge(self, response: requests.Response) -> bool:
+        if response.status_code in CHALLENGE_STATUSES:
+            return True
+        head = response.text[:2048]
+        return f"<title>{CHALLENGE_TITLE}" in head
+
+    def fetch(self, url: str, referer: Optional[str] = None) -> Optional[str]:
+        """HTML of url, or None if the browser has to load it instead"""
+        if not self.ready:
+            return None
+        headers = {'Referer': referer} if referer else None
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.logger.warning(f"HTTP fetch of {url} failed: {e}")
+            return None
+
+        if self._is_challenge(response):
+            self.logger.info(f"HTTP fetch of {url} was challenged, falling back to the browser")
+            self.invalidate()
+            return None
+        if response.status_code != 200:
+            self.logger.warning(f"HTTP fetch of {url} returned {response.status_code}")
+            return None
+        return response.text
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,103 @@
+from typing import List, Optional
+from urllib.parse import urljoin
+from models import ListingData
+from normalization import parse_area, parse_number
+import logging
+import re
+
+try:
+    from lxml import html as lxml_html
+    from lxml.etree import XPath
+except ImportError:
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+# "... aramanızda 12.345 ilan bulundu." above the results table
+RESULT_TEXT = re.compile(r'class="[^"]*\bresult-text\b[^"]*"[^>]*>(.*?)</div>', re.S)
+RESULT_COUNT = re.compile(r'(\d[\d.]*)\s*ilan')
+TAGS = re.compile(r'<[^>]+>')
+
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements that carry the class name"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml_html is not None:
+    # Compiled once, reused for every results page
+    ROWS = XPath("//*[@id='searchResultsTable']//tbody/tr")
+    TITLE = XPath(f".//a[{has_class('classifiedTitle')}]")
+    ATTRIBUTE_VALUES = XPath(f".//*[{has_class('searchResultsAttributeValue')}]")
+    PRICE = XPath(f".//*[{has_class('searchResultsPriceValue')}]")
+    DATE = XPath(".//*[contains(@class, 'searchResultsDateValue')]")
+    LOCATION = XPath(".//*[contains(@class, 'searchResultsLocationValue')]")
+    IMAGE = XPath(".//img/@src")
+
+
+def is_available() -> bool:
+    """Whether the snapshot parser can be used (lxml installed)"""
+    return lxml_html is not None
+
+
+def _text(elements) -> str:
+    """Join text nodes of the first element the way the browser renders line breaks"""
+    if not elements:
+        return ''
+    return ' '.join(part.strip() for part in elements[0].itertext() if part.strip())
+
+
+def parse_listing_rows(page_html: str, base_url: str = '') -> List[ListingData]:
+    """Extract all listings from a results page HTML snapshot.
+
+    Pure function over the HTML string, so it can run outside the browser
+    thread. Links are resolved against base_url like DrissionPage's attr()
+    does. Raises ValueError if the results table is missing.
+    """
+    if not is_available():
+        raise RuntimeError("lxml is required for snapshot parsing")
+
+    tree = lxml_html.fromstring(page_html)
+    rows = ROWS(tree)
+    if not rows:
+        raise ValueError("Results table not found in snapshot")
+
+    listings = []
+    for row in rows:
+        try:
+            class_attr = row.get('class', '')
+            if 'nativeAd' in class_attr or 'searchResultsPromoToplist' in class_attr:
+                continue
+
+            title_element = TITLE(row)
+            if not title_element:
+                continue
+            title_element = title_element[0]
+
+            attribute_values = ATTRIBUTE_VALUES(row)
+            image = IMAGE(row)
+            listings.append(ListingData(
+                listing_id=row.get('data-id'),
+                title=title_element.text_content().strip(),
+                size_m2=parse_area(_text(attribute_values[:1])) or 0.0,
+                room_count=_text(attribute_values[1:2]),
+                price=_text(PRICE(row)),
+                date=_text(DATE(row)),
+                location=_text(LOCATION(row)),
+                image_url=urljoin(base_url, image[0]) if image else None,
+                detail_url=urljoin(base_url, title_element.get('href', ''))
+            ))
+        except Exception as e:
+            logger.error(f"Error parsing listing row: {e}", exc_info=True)
+            continue
+
+    return listings
+
+
+def parse_result_count(page_html: str) -> Optional[int]:
+    """Total number of results of a search, None if the page does not show it"""
+    match = RESULT_TEXT.search(page_html or '')
+    if not match:
+        return None
+    count = RESULT_COUNT.search(TAGS.sub(' ', match.group(1)))
+    return int(parse_number(count.group(1))) if count else None
@@ -0,0 +1,259 @@
+from typing import Any, Dict, Iterable, List, Optional
+from normalization import normalize, to_record
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+# Columns copied out of a record for filtering, the full record is kept as JSON
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    listing_id TEXT NOT NULL UNIQUE,
+    title TEXT,
+    location TEXT,
+    price REAL,
+    currency TEXT,
+    room_count TEXT,
+    rooms INTEGER,
+    living_rooms INTEGER,
+    size_m2 REAL,
+    price_per_m2 REAL,
+    listing_date TEXT,
+    scraped_at TEXT,
+    detail_url TEXT,
+    description TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_listings_location ON listings (location, price);
+CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (price);
+CREATE INDEX IF NOT EXISTS idx_listings_rooms ON listings (room_count, price);
+CREATE INDEX IF NOT EXISTS idx_listings_date ON listings (listing_date);
+"""
+
+# External content FTS index over descriptions, kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS listings_fts USING fts5(
+    title, description, content='listings', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS listings_ai AFTER INSERT ON listings BEGIN
+    INSERT INTO listings_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS listings_ad AFTER DELETE ON listings BEGIN
+    INSERT INTO listings_fts (listings_fts, rowid, title, description)
+    VALUES ('delete', old.rowid, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS listings_au AFTER UPDATE ON listings BEGIN
+    INSERT INTO listings_fts (listings_fts, rowid, title, description)
+    VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO listings_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+"""
+
+UPSERT = """
+INSERT INTO listings (
+    listing_id, title, location, price, currency, room_count, rooms, living_rooms,
+    size_m2, price_per_m2, listing_date, scraped_at, detail_url, description, data
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (listing_id) DO UPDATE SET
+    title = excluded.title, location = excluded.location, price = excluded.price,
+    currency = excluded.currency, room_count = excluded.room_count, rooms = excluded.rooms,
+    living_rooms = excluded.living_rooms, size_m2 = excluded.size_m2,
+    price_per_m2 = excluded.price_per_m2, listing_date = excluded.listing_date,
+    scraped_at = excluded.scraped_at, detail_url = excluded.detail_url,
+    description = excluded.description, data = excluded.data
+"""
+
+ORDER_COLUMNS = ('price', 'price_per_m2', 'size_m2', 'listing_date', 'scraped_at')
+
+
+class ListingStore:
+    """SQLite store of scraped listings with secondary and full-text indexes.
+
+    Records are upserted by listing_id, so re-scraped listings replace their
+    previous version. Writes are committed in batches like SQLiteStateManager.
+    """
+    def __init__(self, db_file: str, batch_size: int = 200, commit_interval: float = 5.0):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"FTS5 unavailable, text search falls back to LIKE: {e}")
+            self.has_fts = False
+        self.conn.commit()
+
+    @staticmethod
+    def _row(record: Dict[str, Any]) -> tuple:
+        listing = record.get('listing') or {}
+        property_details = record.get('property_details') or {}
+        normalized = record.get('normalized') or to_record(normalize(listing, property_details))
+        return (
+            str(listing.get('listing_id')),
+            listing.get('title'),
+            listing.get('location'),
+            normalized.get('price'),
+            normalized.get('currency'),
+            listing.get('room_count'),
+            normalized.get('rooms'),
+            normalized.get('living_rooms'),
+            normalized.get('size_m2'),
+            normalized.get('price_per_m2'),
+            normalized.get('listing_date'),
+            record.get('scraped_at'),
+            listing.get('detail_url'),
+            property_details.get('description'),
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    def add(self, record: Dict[str, Any]):
+        """Upsert one record, committed in batches"""
+        with self._lock:
+            self.conn.execute(UPSERT, self._row(record))
+            self._pending += 1
+        if (self._pending >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self.commit()
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Bulk load records in a single transaction"""
+        count = 0
+        with self._lock:
+            for record in records:
+                self.conn.execute(UPSERT, self._row(record))
+                count += 1
+            self.conn.commit()
+        return count
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        self.commit()
+        with self._lock:
+            self.conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def query(self, location: Optional[str] = None, room_count: Optional[str] = None,
+              min_price: Optional[float] = None,
+              max_price: Optional[float] = None, since: Optional[str] = None,
+              until: Optional[str] = None, text: Optional[str] = None,
+              order_by: str = 'price', descending: bool = False,
+              limit: int = 50) -> List[Dict[str, Any]]:
+        """Filter listings, every filter is served by an index.
+
+        location matches by prefix ("Kadıköy" finds "Kadıköy Moda"), text is an
+        FTS5 query over title and description, dates are ISO strings.
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order by {order_by}")
+        clauses, params = [], []
+        if location:
+            # Range instead of LIKE so the location index is used
+            clauses.append("l.location >= ? AND l.location < ?")
+            params += [location, location + '\uffff']
+        if room_count:
+            clauses.append("l.room_count = ?")
+            params.append(room_count)
+        if min_price is not None:
+            clauses.append("l.price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("l.price <= ?")
+            params.append(max_price)
+        if since:
+            clauses.append("l.listing_date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("l.listing_date <= ?")
+            params.append(until)
+        if text and self.has_fts:
+            clauses.append("l.rowid IN (SELECT rowid FROM listings_fts WHERE listings_fts MATCH ?)")
+            params.append(text)
+        elif text:
+            clauses.append("(l.description LIKE ? OR l.title LIKE ?)")
+            params += [f'%{text}%', f'%{text}%']
+
+        sql = (
+            "SELECT l.listing_id, l.title, l.location, l.price, l.currency, l.room_count, "
+            "l.size_m2, l.price_per_m2, l.listing_date, l.detail_url FROM listings l"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY l.{order_by} {'DESC' if descending else 'ASC'} LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def get(self, listing_id: str) -> Optional[Dict[str, Any]]:
+        """Full stored record of a listing"""
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM listings WHERE listing_id = ?", (str(listing_id),)).fetchone()
+        return json.loads(row['data']) if row else None
+
+
+def main():
+    from config import PATHS
+    from exporters import RecordStream
+
+    parser = argparse.ArgumentParser(description="Query the local listing store")
+    parser.add_argument("--db", default=PATHS['LISTING_DB'], help="Listing store database")
+    parser.add_argument("--load", help="Import a JSON or JSONL data file into the store first")
+    parser.add_argument("--location", help="Location prefix, e.g. 'Kadıköy'")
+    parser.add_argument("--rooms", help="Room count, e.g. '3+1'")
+    parser.add_argument("--min-price", type=float, help="Minimum price")
+    parser.add_argument("--max-price", type=float, help="Maximum price")
+    parser.add_argument("--since", help="Listed on or after (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Listed on or before (YYYY-MM-DD)")
+    parser.add_argument("--text", help="Full-text query over title and description")
+    parser.add_argument("--order-by", choices=ORDER_COLUMNS, default='price', help="Sort column")
+    parser.add_argument("--desc", action="store_true", help="Sort descending")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum rows returned")
+    parser.add_argument("--json", action="store_true", help="Print full records as JSON lines")
+    args = parser.parse_args()
+
+    store = ListingStore(args.db)
+    try:
+        if args.load:
+            count = store.add_many(RecordStream(args.load))
+            print(f"Loaded {count} records into {args.db}")
+
+        start = time.perf_counter()
+        rows = store.query(
+            location=args.location, room_count=args.rooms, min_price=args.min_price,
+            max_price=args.max_price, since=args.since, until=args.until, text=args.text,
+            order_by=args.order_by, descending=args.desc, limit=args.limit
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        for row in rows:
+            if args.json:
+                print(json.dumps(store.get(row['listing_id']), ensure_ascii=False))
+            else:
+                price = f"{row['price']:,.0f} {row['currency'] or ''}" if row['price'] is not None else '-'
+                print(f"{row['listing_id']:>12}  {price:>18}  {row['room_count'] or '-':>6}  "
+                      f"{row['location'] or '-':<30}  {row['title']}")
+        print(f"{len(rows)} rows in {elapsed:.1f} ms")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
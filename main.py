@@ -1,7 +1,15 @@
 import logging
-from state_manager import StateManager
-from controllers.cli_controller import CLIScrapeController
-from arg_parser import create_argument_parser, get_scraper_args, handle_export_args
+import os
+from config import PATHS
+from exporters import CSVExporter, ExcelExporter, JSONExporter, ParquetExporter, get_available_fields
+from export_plan import ExportPlan
+from normalization import normalize_file
+from state_manager import create_state_manager
+from work_queue import WorkQueue, default_worker_id
+from profiler import profiled
+from profile_manager import ProfileTemplate
+from controllers.cli_controller import CLIScrapeController, AsyncCLIScrapeController
+from arg_parser import create_argument_parser, get_scraper_args, get_sink_args, handle_export_args
 
 def setup_logging():
     logging.basicConfig(
@@ -9,19 +17,37 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-def main():
-    parser = create_argument_parser()
-    args = parser.parse_args()
-    setup_logging()
+EXPORTERS = {
+    'csv': (CSVExporter, 'csv'),
+    'excel': (ExcelExporter, 'xlsx'),
+    'json': (JSONExporter, 'json'),
+    'parquet': (ParquetExporter, 'parquet'),
+}
+
+def export_path(args, extension: str) -> str:
+    if not args.export_file:
+        return os.path.join(PATHS['DEFAULT_EXPORT'], f'export.{extension}')
+    if len(args.export) == 1:
+        return args.export_file
+    return f"{os.path.splitext(args.export_file)[0]}.{extension}"
+
+def run_export(args):
+    """Stream the scraped data file into every requested export format at once"""
     logger = logging.getLogger(__name__)
+    source = args.input or PATHS['CONTINUOUS_JSONL']
+    plan = ExportPlan.from_json(source, args.fields or get_available_fields(), args.parallel)
+    for export_format in dict.fromkeys(args.export):
+        exporter_cls, extension = EXPORTERS[export_format]
+        options = {}
+        if export_format == 'parquet':
+            options = {'partition_by': args.partition_by, 'row_group_size': args.row_group_size}
+        plan.add_target(exporter_cls, export_path(args, extension), **options)
+    count = plan.execute()
+    logger.info(f"Exported {count} records from {source} to {', '.join(args.export)}")
 
-    # Handle utility arguments
-    if handle_export_args(args):
-        return
+def run_scraper(args, state_manager):
+    logger = logging.getLogger(__name__)
 
-    # Initialize state manager
-    state_manager = StateManager(args.state if args.state else "scraper_state.json")
-    
     # Handle resume logic
     if args.resume:
         if not state_manager.state:
@@ -29,20 +55,70 @@ def main():
             return
             
         saved_args = state_manager.get_scraper_args()
-        scraper_args = {k: getattr(args, k) if getattr(args, k) != v else v 
+        # Saved keys match the argparse dests, keys of newer states fall back to the saved value
+        scraper_args = {k: getattr(args, k, v) if getattr(args, k, v) != v else v 
                        for k, v in saved_args.items()}
         args.url = state_manager.state.url
         
-    elif args.url:
+    elif args.url or args.coordinator:
         scraper_args = get_scraper_args(args)
-        state_manager.initialize_state(args.url, **scraper_args)
+        state_manager.initialize_state(args.url or args.coordinator, **scraper_args)
     else:
-        logger.error("Either --url or --resume must be specified")
+        logger.error("Either --url, --resume or --coordinator must be specified")
         return
 
     # Start scraping
-    controller = CLIScrapeController(state_manager)
-    controller.start_scraping(args.url, scraper_args)
+    # Workers of a shared crawl take their work from the queue, not a loop
+    controller_cls = AsyncCLIScrapeController if args.use_async and not args.coordinator else CLIScrapeController
+    controller = controller_cls(
+        state_manager, get_sink_args(args),
+        listing_db=None if args.no_listing_db else args.listing_db
+    )
+    if args.coordinator:
+        queue = WorkQueue(args.coordinator, lease_timeout=args.lease_timeout)
+        try:
+            with profiled('worker', args.profile, args.profile_dir, top=args.profile_top):
+                controller.run_worker(queue, args.url, scraper_args, args.worker_id)
+        finally:
+            queue.close()
+        return
+    with profiled('scrape', args.profile, args.profile_dir, top=args.profile_top):
+        controller.start_scraping(args.url, scraper_args)
+
+def main():
+    parser = create_argument_parser()
+    args = parser.parse_args()
+    setup_logging()
+
+    # Handle utility arguments
+    if handle_export_args(args):
+        return
+
+    if args.normalize:
+        with profiled('normalize', args.profile, args.profile_dir, top=args.profile_top):
+            normalize_file(args.input or PATHS['CONTINUOUS_JSONL'], args.normalize)
+        return
+
+    if args.export:
+        with profiled('export', args.profile, args.profile_dir, top=args.profile_top):
+            run_export(args)
+        return
+
+    if args.rebuild_profile_template:
+        ProfileTemplate().ensure(refresh=True)
+
+    # Initialize state manager, workers of a shared crawl keep one each
+    state_file = args.state or "scraper_state.json"
+    if args.coordinator:
+        args.worker_id = args.worker_id or default_worker_id()
+        if not args.state:
+            state_file = f"{os.path.splitext(args.coordinator)[0]}-{args.worker_id}.json"
+    state_manager = create_state_manager(state_file, args.state_backend, args.seen_ids)
+    try:
+        run_scraper(args, state_manager)
+    finally:
+        # Merges the seen id journal and commits the last batch of state
+        state_manager.close()
 
 if __name__ == "__main__":
     main()
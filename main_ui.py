@@ -2,13 +2,42 @@ from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QLineEdit, QTextEdit, QSpinBox, QCheckBox
 )
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+import asyncio
 import sys
 import io
 import logging
 from contextlib import redirect_stdout
-from controllers.cli_controller import CLIScrapeController
+from controllers.cli_controller import CLIScrapeController, AsyncCLIScrapeController
 from state_manager import StateManager
+from config import PATHS
+from profiler import PROFILE_MODES, profiled
+import argparse
+
+try:
+    import qasync
+except ImportError:
+    qasync = None
+
+# Qt consumes its own arguments, --profile is picked out of the rest
+_ui_parser = argparse.ArgumentParser(add_help=False)
+_ui_parser.add_argument("--profile", choices=PROFILE_MODES)
+_ui_parser.add_argument("--profile-dir", default=PATHS['PROFILES'])
+_ui_parser.add_argument("--async", dest="use_async", action="store_true")
+_ui_parser.add_argument("--metrics-port", type=int)
+_ui_parser.add_argument("--metrics-file")
+UI_ARGS, _ = _ui_parser.parse_known_args()
+
+
+def ui_scraper_args(max_pages, delay, headless) -> dict:
+    """Scraper arguments of a UI run, metrics options come from the command line"""
+    return {
+        'max_pages': max_pages,
+        'delay': delay,
+        'headless': headless,
+        'metrics_port': UI_ARGS.metrics_port,
+        'metrics_file': UI_ARGS.metrics_file
+    }
 
 class QTextEditLogger(logging.Handler):
     def __init__(self, signal):
@@ -27,11 +56,7 @@ class ScraperWorker(QThread):
     def __init__(self, url, max_pages, delay, headless, state_manager=None):
         super().__init__()
         self.url = url
-        self.scraper_args = {
-            'max_pages': max_pages,
-            'delay': delay,
-            'headless': headless
-        }
+        self.scraper_args = ui_scraper_args(max_pages, delay, headless)
         # Use provided state manager or create new one
         self.state_manager = state_manager or StateManager()
         self.controller = CLIScrapeController(self.state_manager)
@@ -48,7 +73,8 @@ class ScraperWorker(QThread):
             # Only initialize state if no existing state
             if not self.state_manager.state:
                 self.state_manager.initialize_state(self.url, **self.scraper_args)
-            self.controller.start_scraping(self.url, self.scraper_args)
+            with profiled('scrape-ui', UI_ARGS.profile, UI_ARGS.profile_dir):
+                self.controller.start_scraping(self.url, self.scraper_args)
         except Exception as e:
             self.output_ready.emit(f"Error: {str(e)}")
         finally:
@@ -62,9 +88,56 @@ class ScraperWorker(QThread):
             self.controller.stop()
             # Don't wait here anymore
 
+class AsyncScraperRunner(QObject):
+    """ScraperWorker counterpart that runs the crawl as a task on the Qt event loop.
+
+    Needs the qasync loop installed in __main__; the GUI stays responsive
+    because the crawl only awaits, and stop() cancels it right away.
+    """
+    output_ready = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, url, max_pages, delay, headless, state_manager=None):
+        super().__init__()
+        self.url = url
+        self.scraper_args = ui_scraper_args(max_pages, delay, headless)
+        self.state_manager = state_manager or StateManager()
+        self.controller = AsyncCLIScrapeController(self.state_manager)
+        self.task = None
+        self.log_handler = QTextEditLogger(self.output_ready)
+        logging.getLogger().setLevel(logging.INFO)
+        logging.getLogger().addHandler(self.log_handler)
+
+    def start(self):
+        self.task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        try:
+            if not self.state_manager.state:
+                self.state_manager.initialize_state(self.url, **self.scraper_args)
+            with profiled('scrape-ui', UI_ARGS.profile, UI_ARGS.profile_dir):
+                await self.controller.run(self.url, self.scraper_args)
+        except Exception as e:
+            self.output_ready.emit(f"Error: {str(e)}")
+        finally:
+            logging.getLogger().removeHandler(self.log_handler)
+            self.finished.emit()
+
+    def stop(self):
+        self.controller.stop()
+
+    def wait(self, msecs: int) -> bool:
+        """Whether the crawl has ended, the loop cannot block here"""
+        return self.task is None or self.task.done()
+
+    def terminate(self):
+        if self.task:
+            self.task.cancel()
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, use_async: bool = False):
         super().__init__()
+        self.worker_cls = AsyncScraperRunner if use_async else ScraperWorker
         self.setWindowTitle("Sahibinden Scraper")
         self.setMinimumSize(800, 600)
         self.worker = None
@@ -160,6 +233,8 @@ class MainWindow(QMainWindow):
         )
         if filename:
             try:
+                # Release the previous session's seen id set before opening another
+                self.state_manager.close()
                 self.state_manager = StateManager(filename)
                 if self.state_manager.state:
                     # Store current session file
@@ -225,7 +300,7 @@ class MainWindow(QMainWindow):
         self.log_area.clear()
 
         # Pass the current state_manager to worker
-        self.worker = ScraperWorker(
+        self.worker = self.worker_cls(
             self.url_input.text(),
             self.max_pages_spinbox.value(),
             self.delay_spinbox.value(),
@@ -276,10 +351,22 @@ class MainWindow(QMainWindow):
             # Give a short timeout for cleanup
             if not self.worker.wait(1000):  # Wait max 1 second
                 self.worker.terminate()  # Force quit if still running
+        # Merges the seen id journal into the sorted id file
+        self.state_manager.close()
         event.accept()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    window = MainWindow()
+    use_async = UI_ARGS.use_async and qasync is not None
+    if UI_ARGS.use_async and not use_async:
+        logging.warning("--async needs qasync (pip install qasync), using the threaded worker")
+    window = MainWindow(use_async)
     window.show()
+    if use_async:
+        # One loop for Qt and asyncio, the crawl runs as a task on it
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        with loop:
+            loop.run_forever()
+        sys.exit()
     sys.exit(app.exec_())
@@ -2,13 +2,19 @@ import time
 from DrissionPage import ChromiumPage
 from DrissionPage.common import wait_until
 from CloudflareBypasser import CloudflareBypasser
+from rate_limiter import AdaptiveRateLimiter
 import logging
 
+# Seconds to wait for a page or the message form to become ready
+READY_TIMEOUT = 10
+MESSAGE_READY = "tag:div@@class=msg-form"
+
 class SahibindenMessager:
-    def __init__(self, message, delay=1.5):
+    def __init__(self, message, delay=1.5, rate_limiter: AdaptiveRateLimiter = None):
         self.page = ChromiumPage()
         self.message = message
         self.delay = delay
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter.from_delay(delay)
         self.cf_bypasser = CloudflareBypasser(self.page)
         self.logger = logging.getLogger(__name__)
 
@@ -34,8 +40,9 @@ class SahibindenMessager:
                     if state_check(self):  # Pass self to state check
                         return result
                 self.logger.info(f"Unexpected state. Current URL: {self.page.url}")
+                self.rate_limiter.on_challenge()
                 self.cf_bypasser.bypass()
-                time.sleep(self.delay)
+                self.rate_limiter.acquire()
                 self.logger.info("Waiting user to proceed, Please type 'y' to continue")
                 print(self.args, self.kwargs)
                 if input() == 'y':
@@ -46,21 +53,28 @@ class SahibindenMessager:
         return decorator
     
     def _get_page(self, url: str):
+        self.rate_limiter.acquire()
         self.page.get(url)
+        if not self.cf_bypasser.is_bypassed():
+            self.rate_limiter.on_challenge()
         self.cf_bypasser.bypass()
-        while self.page.url_available is False:
-            time.sleep(1)
-        time.sleep(self.delay)
+        wait_start = time.perf_counter()
+        self.page.wait.doc_loaded(timeout=READY_TIMEOUT)
+        self.logger.debug(f"Page ready after {time.perf_counter() - wait_start:.2f}s")
         if self.page.url != url:
             self.logger.info(f"Redirected to: {self.page.url}")
+            self.rate_limiter.on_challenge()
             self.cf_bypasser.bypass()
-            time.sleep(self.delay)
+            # Wait for the lowered rate instead of a fixed delay
+            self.rate_limiter.acquire()
             self.logger.info("Waiting user to proceed, Please type 'y' to continue")
             if input() == 'y':
                 self._get_page(url)
+        else:
+            self.rate_limiter.on_success()
 
     def _find_message_box(self):
-        message_box_div = self.page.ele("tag:div@@class=msg-form")
+        message_box_div = self.page.ele(MESSAGE_READY, timeout=READY_TIMEOUT)
         message_box = message_box_div.ele("tag:textarea@@id:messageContent")
         return message_box # ChromiumElement
     
@@ -74,12 +88,21 @@ class SahibindenMessager:
         return detail_message_button # ChromiumElement
     
 
+    def _clicked_through(self, old_url: str):
+        return self.page.url != old_url or self.page.ele(MESSAGE_READY, timeout=0)
+
     @state_guard([_is_message_page, _is_detail_page])
     def _click(self, button):
+        old_url = self.page.url
         button.click()
-        time.sleep(self.delay)
-        while self.page.states.ready_state != "complete":
-            time.sleep(1)
+        wait_start = time.perf_counter()
+        # doc_loaded may answer for the old document, wait for the new url or the message form first
+        try:
+            wait_until(self._clicked_through, {'old_url': old_url}, timeout=READY_TIMEOUT)
+        except TimeoutError:
+            self.logger.warning(f"Page did not change within {READY_TIMEOUT}s after click")
+        self.page.wait.doc_loaded(timeout=READY_TIMEOUT)
+        self.logger.debug(f"Ready after click in {time.perf_counter() - wait_start:.2f}s")
         
     def send_message(self, url: str):
         try:
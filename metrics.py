@@ -0,0 +1,197 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+# Upper bounds in seconds, a final +Inf bucket is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Stages timed across the scraper, listed so they are exported even before use
+STAGES = ('page_load', 'http_fetch', 'cloudflare_bypass', 'listing_parse', 'detail_parse', 'state_save', 'sink_write', 'store_write')
+COUNTERS = ('pages_loaded', 'http_fetches', 'http_fallbacks', 'listings_processed', 'retries', 'challenges', 'redirects', 'failures')
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Thread safe latency histograms per stage and event counters"""
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {stage: Histogram(buckets) for stage in STAGES}
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def inc(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    'mean': round(histogram.sum / histogram.count, 6) if histogram.count else 0.0,
+                    'p50': round(histogram.quantile(0.5), 6),
+                    'p90': round(histogram.quantile(0.9), 6),
+                    'p99': round(histogram.quantile(0.99), 6),
+                }
+                for stage, histogram in self.histograms.items()
+            }
+            counters = dict(self.counters)
+        return {
+            'timestamp': time.time(),
+            'uptime': round(time.time() - self.started, 3),
+            'counters': counters,
+            'stages': stages,
+        }
+
+    def prometheus_text(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            '# HELP scraper_stage_seconds Time spent per scraping stage',
+            '# TYPE scraper_stage_seconds histogram',
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+                lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in sorted(self.counters.items()):
+                lines.append(f'# TYPE scraper_{counter}_total counter')
+                lines.append(f'scraper_{counter}_total {value}')
+        lines.append('# TYPE scraper_uptime_seconds gauge')
+        lines.append(f'scraper_uptime_seconds {time.time() - self.started:.3f}')
+        return '\n'.join(lines) + '\n'
+
+
+# Process wide registry the scraper, state manager and sinks record into
+registry = MetricsRegistry()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = registry
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/metrics':
+            body, content_type = self.registry.prometheus_text(), 'text/plain; version=0.0.4'
+        elif path == '/metrics.json':
+            body, content_type = json.dumps(self.registry.snapshot()), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MetricsPublisher:
+    """Serves /metrics and /metrics.json and writes periodic JSON snapshots.
+
+    port=0 picks a free port, port=None disables the endpoint and
+    snapshot_file=None disables the snapshots.
+    """
+    def __init__(self, metrics: MetricsRegistry = registry, port: Optional[int] = None,
+                 snapshot_file: Optional[str] = None, interval: float = 10.0, host: str = '127.0.0.1'):
+        self.metrics = metrics
+        self.snapshot_file = snapshot_file
+        self.interval = interval
+        self.logger = logging.getLogger(__name__)
+        self._stopped = threading.Event()
+        self.server = None
+        self._threads = []
+
+        if port is not None:
+            handler = type('Handler', (MetricsHandler,), {'registry': metrics})
+            self.server = ThreadingHTTPServer((host, port), handler)
+            self.server.daemon_threads = True
+            self._threads.append(threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True))
+            self.logger.info(f"Serving metrics at http://{host}:{self.server.server_address[1]}/metrics")
+        if snapshot_file:
+            self._threads.append(threading.Thread(target=self._write_snapshots, name='metrics-snapshot', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def port(self) -> Optional[int]:
+        return self.server.server_address[1] if self.server else None
+
+    def write_snapshot(self):
+        tmp_path = self.snapshot_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.metrics.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.snapshot_file)
+
+    def _write_snapshots(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                self.logger.warning(f"Failed to write metrics snapshot: {e}")
+
+    def close(self):
+        self._stopped.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if self.snapshot_file:
+            self.write_snapshot()
@@ -0,0 +1,228 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from string import Template
+from urllib.parse import urlparse, parse_qs
+import argparse
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'mock_site')
+
+DISTRICTS = [('Kadıköy', 'Moda'), ('Beşiktaş', 'Levent'), ('Üsküdar', 'Çengelköy'), ('Şişli', 'Nişantaşı')]
+ROOMS = ['1+1', '2+1', '3+1', '4+1']
+DETAIL_PATH = re.compile(r'^/ilan/emlak-konut-satilik-(\d+)/detay$')
+
+
+def _load_fixture(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+
+class MockSiteConfig:
+    """Behaviour knobs of the mock site"""
+    def __init__(self, pages: int = 5, listings_per_page: int = 20, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, challenge_rate: float = 0.0,
+                 challenge_solve_ms: int = 1000, seed: int = None):
+        self.pages = pages
+        self.listings_per_page = listings_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.challenge_rate = challenge_rate
+        self.challenge_solve_ms = challenge_solve_ms
+        self.random = random.Random(seed)
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """Serves fixture based search results, detail and challenge pages"""
+    config: MockSiteConfig = None
+    templates = {}
+    stats = None
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format % args)
+
+    def _listing(self, listing_id: int) -> dict:
+        district, neighbourhood = DISTRICTS[listing_id % len(DISTRICTS)]
+        gross_area = 60 + (listing_id * 7) % 140
+        return {
+            'listing_id': listing_id,
+            'title': f'{district} {neighbourhood} satılık daire #{listing_id}',
+            'size_m2': gross_area,
+            'gross_area': gross_area,
+            'net_area': gross_area - 10,
+            'room_count': ROOMS[listing_id % len(ROOMS)],
+            'price': f'{1_000_000 + (listing_id % 1000) * 1250:,} TL'.replace(',', '.'),
+            'date': '12 Ekim 2024',
+            'date_day': '12 Ekim',
+            'date_year': '2024',
+            'district': district,
+            'neighbourhood': neighbourhood,
+            'description': f'Mock ilan açıklaması {listing_id}.',
+            'name_class': f'{listing_id:08x}',
+        }
+
+    def _send(self, status: int, body: str, headers: dict = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.stats.record(self.path, status, len(data))
+
+    def _results_page(self, page: int) -> str:
+        config = self.config
+        first_id = 1_000_000 + (page - 1) * config.listings_per_page
+        rows = '\n'.join(
+            self.templates['row'].substitute(self._listing(first_id + i))
+            for i in range(config.listings_per_page)
+        )
+        pagination = ''
+        if page < config.pages:
+            pagination = f'<li><a class="prevNextBut" href="/emlak?page={page + 1}">Sonraki</a></li>'
+        total = f"{config.pages * config.listings_per_page:,}".replace(',', '.')
+        return self.templates['results'].substitute(rows=rows, pagination=pagination, total=total)
+
+    def do_GET(self):
+        config = self.config
+        if config.latency or config.jitter:
+            time.sleep(max(0.0, config.latency + config.random.uniform(-config.jitter, config.jitter)))
+
+        if config.random.random() < config.error_rate:
+            return self._send(500, '<html><head><title>Error</title></head><body>Internal error</body></html>')
+
+        cookies = SimpleCookie(self.headers.get('Cookie', ''))
+        if 'mock_cf_pass' in cookies:
+            # Challenge was just solved, let this request through once
+            clear_cookie = {'Set-Cookie': 'mock_cf_pass=; Path=/; Max-Age=0'}
+        else:
+            clear_cookie = None
+            if config.random.random() < config.challenge_rate:
+                with self.stats.lock:
+                    self.stats.challenges += 1
+                return self._send(403, self.templates['challenge'].substitute(
+                    solve_ms=config.challenge_solve_ms
+                ))
+
+        parsed = urlparse(self.path)
+        detail_match = DETAIL_PATH.match(parsed.path)
+        if parsed.path == '/emlak':
+            page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+            if page > config.pages:
+                return self._send(404, '<html><head><title>Not found</title></head></html>')
+            return self._send(200, self._results_page(page), clear_cookie)
+        if detail_match:
+            listing_id = int(detail_match.group(1))
+            # Alternate between store and individual seller variants
+            template = self.templates['store' if listing_id % 2 == 0 else 'individual']
+            return self._send(200, template.substitute(self._listing(listing_id)), clear_cookie)
+        if parsed.path.startswith('/photos/'):
+            return self._send(200, '')
+        return self._send(404, '<html><head><title>Not found</title></head></html>')
+
+
+class MockSiteStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.challenges = 0
+        self.bytes_sent = 0
+
+    def record(self, path: str, status: int, size: int):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+            if status >= 500:
+                self.errors += 1
+
+
+class MockSite:
+    """Local stand-in for sahibinden.com serving recorded fixtures.
+
+    Usage:
+        with MockSite(MockSiteConfig(pages=3)) as site:
+            scrape(site.search_url)
+    """
+    def __init__(self, config: MockSiteConfig = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockSiteConfig()
+        self.stats = MockSiteStats()
+        handler = type('BoundMockSiteHandler', (MockSiteHandler,), {
+            'config': self.config,
+            'stats': self.stats,
+            'templates': {
+                'results': _load_fixture('search_results.html'),
+                'row': _load_fixture('search_results_row.html'),
+                'store': _load_fixture('detail_store.html'),
+                'individual': _load_fixture('detail_individual.html'),
+                'challenge': _load_fixture('challenge.html'),
+            }
+        })
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def search_url(self) -> str:
+        return f'{self.base_url}/emlak?page=1'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_mock_site_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--pages", type=int, default=5, help="Number of results pages")
+    parser.add_argument("--listings-per-page", type=int, default=20, help="Listings on each results page")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random latency jitter in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--challenge-rate", type=float, default=0.0, help="Fraction of requests answered with a challenge page")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+
+
+def config_from_args(args: argparse.Namespace) -> MockSiteConfig:
+    return MockSiteConfig(
+        pages=args.pages,
+        listings_per_page=args.listings_per_page,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        challenge_rate=args.challenge_rate,
+        seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an offline Sahibinden stand-in")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    add_mock_site_arguments(parser)
+    args = parser.parse_args()
+    site = MockSite(config_from_args(args), port=args.port)
+    print(f"Serving mock site at {site.search_url}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        site.server.server_close()
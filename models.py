@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from datetime import date
 from typing import Optional
 
 ####################################################################################################
@@ -50,3 +51,20 @@ class ContactInfo:
     agent_name: str
     office_phone: str
     mobile_phone: str
+
+@dataclass
+class NormalizedListing:
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    listing_date: Optional[date] = None
+    size_m2: Optional[float] = None
+    gross_area: Optional[float] = None
+    net_area: Optional[float] = None
+    rooms: Optional[int] = None
+    living_rooms: Optional[int] = None
+    building_age_min: Optional[int] = None
+    building_age_max: Optional[int] = None
+    floor_number: Optional[int] = None
+    floor_category: Optional[str] = None
+    maintenance_fee: Optional[float] = None
+    price_per_m2: Optional[float] = None
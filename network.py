@@ -0,0 +1,112 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+import logging
+import threading
+
+# CDP resource type of each blockable resource, matched by the browser
+# whatever the URL looks like (CDN urls often have no extension)
+RESOURCE_TYPES = {
+    'image': 'Image',
+    'font': 'Font',
+    'media': 'Media',
+    'stylesheet': 'Stylesheet',
+}
+DEFAULT_BLOCKED_TYPES = ('image', 'font', 'media')
+
+# Ad and tracker hosts that never affect the scraped content
+AD_PATTERNS = [
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*googletagmanager.com*',
+    '*google-analytics.com*',
+    '*facebook.net*',
+    '*hotjar.com*',
+    '*criteo.com*',
+    '*adform.net*',
+]
+
+# Sums transfer sizes of the current document and all its subresources
+RESOURCE_USAGE_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let bytes = 0;
+for (const entry of entries) {
+    bytes += entry.transferSize || entry.encodedBodySize || 0;
+}
+return {requests: entries.length, bytes: bytes};
+"""
+
+
+class NetworkMonitor:
+    """Blocks unneeded requests and accounts bandwidth per page type.
+
+    Resource types are blocked through the Fetch domain: requests of those
+    types are paused by the browser and failed as BlockedByClient. Ad hosts
+    and extra URL patterns use Network.setBlockedURLs. Both work in headed
+    and headless mode alike. Accounting reads the Resource Timing entries of each loaded
+    page; cross-origin responses without Timing-Allow-Origin report no size,
+    so byte totals are a lower bound.
+    """
+    def __init__(self, block_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+                 block_patterns: Iterable[str] = None, block_ads: bool = True):
+        self.logger = logging.getLogger(__name__)
+        self.blocked_types: List[str] = []
+        for resource_type in block_types or ():
+            if resource_type not in RESOURCE_TYPES:
+                raise ValueError(f"Unknown resource type: {resource_type}")
+            self.blocked_types.append(RESOURCE_TYPES[resource_type])
+        self.blocked_urls: List[str] = []
+        if block_ads:
+            self.blocked_urls.extend(AD_PATTERNS)
+        self.blocked_urls.extend(block_patterns or ())
+
+        self._lock = threading.Lock()
+        self.usage: Dict[str, Dict[str, int]] = defaultdict(lambda: {'pages': 0, 'requests': 0, 'bytes': 0})
+
+    def attach(self, page):
+        """Enable request blocking on a page or tab"""
+        try:
+            if self.blocked_types:
+                self._block_types(page)
+            if self.blocked_urls:
+                page.run_cdp('Network.enable')
+                page.run_cdp('Network.setBlockedURLs', urls=self.blocked_urls)
+        except Exception as e:
+            self.logger.warning(f"Failed to enable request blocking: {e}")
+
+    def _block_types(self, page):
+        def on_paused(requestId, **_):
+            # Sent without waiting, the handler runs on the tab's event thread
+            page.run_cdp('Fetch.failRequest', requestId=requestId, errorReason='BlockedByClient', _timeout=0)
+
+        # Only requests of the blocked types are paused, everything else is untouched
+        page.driver.set_callback('Fetch.requestPaused', on_paused, immediate=True)
+        page.run_cdp('Fetch.enable', patterns=[
+            {'urlPattern': '*', 'resourceType': resource_type, 'requestStage': 'Request'}
+            for resource_type in self.blocked_types
+        ])
+
+    def record(self, page, page_type: str):
+        """Add the requests and bytes of the currently loaded page"""
+        try:
+            usage = page.run_js(RESOURCE_USAGE_SCRIPT) or {}
+        except Exception as e:
+            self.logger.debug(f"Could not read resource usage: {e}")
+            return
+        with self._lock:
+            totals = self.usage[page_type]
+            totals['pages'] += 1
+            totals['requests'] += int(usage.get('requests', 0))
+            totals['bytes'] += int(usage.get('bytes', 0))
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {page_type: dict(values) for page_type, values in self.usage.items()}
+
+    def summary(self) -> str:
+        parts = []
+        for page_type, values in sorted(self.totals().items()):
+            parts.append(
+                f"{page_type}: {values['pages']} pages, {values['requests']} requests, "
+                f"{values['bytes'] / 1024 / 1024:.2f} MB"
+            )
+        return '; '.join(parts) or 'no pages loaded'
@@ -0,0 +1,292 @@
+from dataclasses import asdict
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import itertools
+import json
+import logging
+import re
+from models import ListingData, NormalizedListing, PropertyDetails
+
+####################################################################################################
+#
+#
+#       SAHIBINDEN SCRAPER  -  NORMALIZATION
+#
+#       Turns the Turkish formatted strings of the site ("1.250.000 TL", "12 Ekim 2024",
+#       "5-10 arası", "Yüksek Giriş") into numeric, date and enum values
+#
+#
+####################################################################################################
+
+logger = logging.getLogger(__name__)
+
+TURKISH_MONTHS = {
+    'ocak': 1, 'şubat': 2, 'mart': 3, 'nisan': 4, 'mayıs': 5, 'haziran': 6,
+    'temmuz': 7, 'ağustos': 8, 'eylül': 9, 'ekim': 10, 'kasım': 11, 'aralık': 12,
+}
+
+CURRENCIES = {
+    'TL': 'TRY', '₺': 'TRY', 'TRY': 'TRY',
+    'USD': 'USD', '$': 'USD',
+    'EUR': 'EUR', '€': 'EUR',
+    'GBP': 'GBP', '£': 'GBP',
+}
+
+# Named floors -> (category, floor number relative to the ground floor)
+FLOOR_CATEGORIES = {
+    'bodrum kat': ('basement', -1),
+    'kot 1': ('basement', -1),
+    'kot 2': ('basement', -2),
+    'kot 3': ('basement', -3),
+    'kot 4': ('basement', -4),
+    'zemin kat': ('ground', 0),
+    'giriş katı': ('ground', 0),
+    'bahçe katı': ('garden', 0),
+    'yüksek giriş': ('high_entrance', 0),
+    'villa tipi': ('villa', None),
+    'müstakil': ('detached', None),
+    'çatı katı': ('roof', None),
+}
+
+NUMBER = re.compile(r'-?\d[\d.,]*')
+DATE = re.compile(r'(\d{1,2})\s+([^\W\d_]+)\s+(\d{4})')
+ROOMS = re.compile(r'(\d+)\s*\+\s*(\d+)')
+AGE_RANGE = re.compile(r'(\d+)\s*-\s*(\d+)')
+AGE_OPEN = re.compile(r'(\d+)\s+ve\s+üzeri')
+
+
+def _lower(text: str) -> str:
+    """Lowercase that keeps Turkish dotted/dotless i intact"""
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Parse a Turkish formatted number ("1.250.000", "120,5 m²")"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.search(str(value))
+    if not match:
+        return None
+    text = match.group().rstrip('.,')
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    elif text.count('.') > 1 or re.search(r'\.\d{3}$', text):
+        # Dots are thousands separators unless a single one precedes a fraction
+        text = text.replace('.', '')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_area(value: Any) -> Optional[float]:
+    """Parse an area such as "1.250 m²" to square metres"""
+    return parse_number(value)
+
+
+def parse_price(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    """Parse "1.250.000 TL" to (1250000.0, 'TRY')"""
+    amount = parse_number(value)
+    currency = None
+    if isinstance(value, str):
+        for symbol, code in CURRENCIES.items():
+            if symbol in value.upper():
+                currency = code
+                break
+    return amount, currency
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """Parse a Turkish date such as "12 Ekim 2024", ISO dates are accepted as well"""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    text = str(value)
+    match = DATE.search(text)
+    if match:
+        month = TURKISH_MONTHS.get(_lower(match.group(2)))
+        if month:
+            try:
+                return date(int(match.group(3)), month, int(match.group(1)))
+            except ValueError:
+                return None
+    try:
+        return date.fromisoformat(text.strip()[:10])
+    except ValueError:
+        return None
+
+
+def parse_rooms(value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Parse "3+1" to (3, 1), a studio counts as one room"""
+    if not value:
+        return None, None
+    match = ROOMS.search(str(value))
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    if 'stüdyo' in _lower(str(value)):
+        return 1, 0
+    return None, None
+
+
+def parse_building_age(value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Parse "5-10 arası" to (5, 10), "31 ve üzeri" to (31, None) and "4" to (4, 4)"""
+    if value is None or value == '':
+        return None, None
+    text = _lower(str(value))
+    match = AGE_RANGE.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = AGE_OPEN.search(text)
+    if match:
+        return int(match.group(1)), None
+    age = parse_number(text)
+    if age is None:
+        return None, None
+    return int(age), int(age)
+
+
+def parse_floor(value: Any) -> Tuple[Optional[int], Optional[str]]:
+    """Parse a floor label to (floor number, category)"""
+    if value is None or value == '':
+        return None, None
+    text = _lower(str(value)).strip()
+    if text in FLOOR_CATEGORIES:
+        category, number = FLOOR_CATEGORIES[text]
+        return number, category
+    match = AGE_OPEN.search(text)
+    number = int(match.group(1)) if match else parse_number(text)
+    if number is None:
+        return None, 'other'
+    return int(number), 'regular'
+
+
+def price_per_m2(price: Optional[float], *areas: Optional[float]) -> Optional[float]:
+    """Price divided by the first known non-zero area"""
+    if price is None:
+        return None
+    for area in areas:
+        if area:
+            return round(price / area, 2)
+    return None
+
+
+# Parsers applied to the raw record fields: (section, source field) -> parser
+PARSERS: Dict[Tuple[str, str], Callable[[Any], Any]] = {
+    ('listing', 'price'): parse_price,
+    ('listing', 'date'): parse_date,
+    ('listing', 'size_m2'): parse_area,
+    ('listing', 'room_count'): parse_rooms,
+    ('property_details', 'room_count'): parse_rooms,
+    ('property_details', 'gross_area'): parse_area,
+    ('property_details', 'net_area'): parse_area,
+    ('property_details', 'building_age'): parse_building_age,
+    ('property_details', 'floor'): parse_floor,
+    ('property_details', 'maintenance_fee'): parse_number,
+}
+
+
+def _build(parsed: Dict[Tuple[str, str], Any]) -> NormalizedListing:
+    """Assemble the typed values of one record, adding derived fields"""
+    price, currency = parsed[('listing', 'price')]
+    rooms, living_rooms = parsed[('property_details', 'room_count')]
+    if rooms is None:
+        rooms, living_rooms = parsed[('listing', 'room_count')]
+    age_min, age_max = parsed[('property_details', 'building_age')]
+    floor_number, floor_category = parsed[('property_details', 'floor')]
+    size_m2 = parsed[('listing', 'size_m2')]
+    gross_area = parsed[('property_details', 'gross_area')]
+    net_area = parsed[('property_details', 'net_area')]
+    return NormalizedListing(
+        price=price,
+        currency=currency,
+        listing_date=parsed[('listing', 'date')],
+        size_m2=size_m2,
+        gross_area=gross_area,
+        net_area=net_area,
+        rooms=rooms,
+        living_rooms=living_rooms,
+        building_age_min=age_min,
+        building_age_max=age_max,
+        floor_number=floor_number,
+        floor_category=floor_category,
+        maintenance_fee=parsed[('property_details', 'maintenance_fee')],
+        price_per_m2=price_per_m2(price, gross_area, size_m2, net_area),
+    )
+
+
+def normalize(listing: Dict[str, Any], property_details: Optional[Dict[str, Any]] = None) -> NormalizedListing:
+    """Typed values of one record's listing and property_details sections"""
+    sections = {'listing': listing or {}, 'property_details': property_details or {}}
+    return _build({
+        (section, name): parser(sections[section].get(name))
+        for (section, name), parser in PARSERS.items()
+    })
+
+
+def to_record(normalized: NormalizedListing) -> Dict[str, Any]:
+    """JSON ready dict, dates become ISO strings"""
+    record = asdict(normalized)
+    if record['listing_date'] is not None:
+        record['listing_date'] = record['listing_date'].isoformat()
+    return record
+
+
+def normalize_details(listing: ListingData, property_details: PropertyDetails) -> Dict[str, Any]:
+    """Normalized section of a freshly scraped listing"""
+    return to_record(normalize(asdict(listing), asdict(property_details)))
+
+
+def _convert_column(values: List[Any], parser: Callable[[Any], Any]) -> List[Any]:
+    """Parse each distinct value of a column once and map the results back"""
+    parsed = {}
+    results = []
+    for value in values:
+        key = None if isinstance(value, (dict, list)) else value
+        if key not in parsed:
+            parsed[key] = parser(key)
+        results.append(parsed[key])
+    return results
+
+
+def normalize_batch(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add a 'normalized' section to a list of records.
+
+    Works column by column: every distinct price, date or floor label in the
+    batch is parsed once, which is most of the work on real datasets where
+    these values repeat heavily.
+    """
+    columns = {
+        (section, name): _convert_column([(record.get(section) or {}).get(name) for record in records], parser)
+        for (section, name), parser in PARSERS.items()
+    }
+    for index, record in enumerate(records):
+        parsed = {key: values[index] for key, values in columns.items()}
+        record['normalized'] = to_record(_build(parsed))
+    return records
+
+
+def normalize_records(records: Iterable[Dict[str, Any]], batch_size: int = 5000) -> Iterator[Dict[str, Any]]:
+    """Stream records through normalize_batch in batches of batch_size"""
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return
+        yield from normalize_batch(batch)
+
+
+def normalize_file(input_path: str, output_path: str, batch_size: int = 5000) -> int:
+    """Write a normalized JSONL copy of an existing JSON or JSONL data file"""
+    from exporters import RecordStream
+
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for record in normalize_records(RecordStream(input_path), batch_size):
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    logger.info(f"Normalized {count} records from {input_path} into {output_path}")
+    return count
+
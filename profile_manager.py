@@ -0,0 +1,170 @@
+from DrissionPage import ChromiumPage
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+
+# Bump when the template layout or ignore patterns change
+TEMPLATE_VERSION = 1
+METADATA_FILE = 'template.json'
+# Rebuild the template after this many seconds so cookies and sessions stay fresh
+TEMPLATE_MAX_AGE = 24 * 3600
+
+
+def _user_cache_dir() -> str:
+    """Per-user cache directory, the template holds the user's cookies and logins"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'sahibinden-scraper')
+
+
+TEMPLATE_ROOT = os.path.join(_user_cache_dir(), 'profile_template')
+# Clones live next to the template, copy-on-write clones need the same filesystem
+CLONES_DIR = 'clones'
+
+IGNORE_PATTERNS = shutil.ignore_patterns(
+    'Cache*', 'Service Worker', '*.log', '*.db',
+    'Network*', 'Media Cache', '*Storage*'
+)
+
+try:
+    import fcntl
+    FICLONE = 0x40049409  # Linux ioctl for copy-on-write file clones
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+_copy_fallback_logged = False
+
+
+def _clone_file(src, dst):
+    """Copy a file using a copy-on-write clone when the filesystem supports it"""
+    global _copy_fallback_logged
+    if fcntl:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError as e:
+            if not _copy_fallback_logged:
+                _copy_fallback_logged = True
+                logger.info(f"Copy-on-write clones not supported ({e}), copying profile files")
+    return shutil.copy2(src, dst)
+
+
+class ProfileTemplate:
+    """Cached Chrome profile template shared between scraper runs.
+
+    The user's Default profile is copied into a versioned template
+    directory, private to the user, and rebuilt once older than max_age
+    seconds. Later scrapers clone the template instead of launching a
+    probe browser and copying the live profile every time.
+    """
+    def __init__(self, root: str = TEMPLATE_ROOT, max_age: float = TEMPLATE_MAX_AGE):
+        self.root = root
+        self.path = os.path.join(root, f'v{TEMPLATE_VERSION}')
+        self.max_age = max_age
+        self.logger = logging.getLogger(__name__)
+
+    def is_built(self) -> bool:
+        metadata = self._load_metadata()
+        return (
+            bool(metadata)
+            and metadata.get('version') == TEMPLATE_VERSION
+            and time.time() - metadata.get('created', 0) < self.max_age
+        )
+
+    def _load_metadata(self) -> dict:
+        try:
+            with open(os.path.join(self.path, METADATA_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _find_chrome_profile_path(self):
+        """Launch a throwaway browser to read the profile path from chrome://version"""
+        temp_browser = ChromiumPage()
+        chrome_profile_path = None
+        try:
+            temp_browser.get('chrome://version')
+            profile_element = temp_browser.ele('#profile_path')
+            if profile_element:
+                chrome_profile_path = os.path.dirname(profile_element.text.strip())
+                self.logger.info(f"Found Chrome profile path: {chrome_profile_path}")
+
+            if not chrome_profile_path:
+                # Try to get from command line as fallback
+                cmd_line = temp_browser.ele('#command_line')
+                if cmd_line:
+                    user_data_match = re.search(r'--user-data-dir=(.*?)(?:\s|$)', cmd_line.text)
+                    if user_data_match:
+                        chrome_profile_path = user_data_match.group(1)
+        except Exception as e:
+            self.logger.warning(f"Could not get Chrome profile path: {e}")
+        finally:
+            temp_browser.quit()
+        return chrome_profile_path
+
+    def build(self):
+        """Build the template from the user's Chrome profile"""
+        chrome_profile_path = self._find_chrome_profile_path()
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        # makedirs leaves existing directories alone, tighten roots made by older versions
+        os.chmod(self.root, 0o700)
+        staging = os.path.join(self.root, f'.staging_{uuid.uuid4().hex[:8]}')
+        os.makedirs(staging, mode=0o700)
+
+        default_profile = os.path.join(chrome_profile_path or '', 'Default')
+        if chrome_profile_path and os.path.exists(default_profile):
+            try:
+                self.logger.info("Copying default Chrome profile into template...")
+                shutil.copytree(
+                    default_profile,
+                    os.path.join(staging, 'Default'),
+                    ignore=IGNORE_PATTERNS
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to copy Chrome profile: {e}")
+
+        with open(os.path.join(staging, METADATA_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': TEMPLATE_VERSION,
+                'source': chrome_profile_path,
+                'created': time.time()
+            }, f, indent=2)
+
+        if os.path.exists(self.path) and not self.is_built():
+            self.logger.info("Replacing outdated profile template")
+            shutil.rmtree(self.path, ignore_errors=True)
+        try:
+            os.rename(staging, self.path)
+        except OSError:
+            # Another job built the template meanwhile, keep theirs
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def ensure(self, refresh: bool = False):
+        if refresh:
+            shutil.rmtree(self.path, ignore_errors=True)
+        if not self.is_built():
+            self.build()
+
+    def clone_path(self, name: str) -> str:
+        """Where to clone the template to, on the template's filesystem"""
+        return os.path.join(self.root, CLONES_DIR, name)
+
+    def clone(self, dest: str):
+        """Clone the template into dest, copy-on-write where possible"""
+        self.ensure()
+        # The clone carries the same cookies, keep it private as well
+        os.makedirs(dest, mode=0o700, exist_ok=True)
+        default_profile = os.path.join(self.path, 'Default')
+        if os.path.exists(default_profile):
+            shutil.copytree(
+                default_profile,
+                os.path.join(dest, 'Default'),
+                copy_function=_clone_file
+            )
+        return dest
@@ -0,0 +1,194 @@
+from collections import Counter
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+
+# Modules whose hot paths are summarized separately
+FOCUS_MODULES = ('scraper.py', 'exporters.py', 'state_manager.py')
+PROFILE_MODES = ('cprofile', 'sample')
+# Innermost frames of threads parked on a lock, queue or socket, not sampled
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('queue.py', 'get'),
+    ('selectors.py', 'select'),
+    ('thread.py', '_worker'),
+}
+
+
+def _label(filename: str, name: str, lineno: int) -> str:
+    """Frame name used in collapsed stacks, e.g. scraper.py:_get_page:138"""
+    return f"{os.path.basename(filename)}:{name}:{lineno}"
+
+
+class Profiler:
+    """Profiles a block of code and writes collapsed stacks plus a hotspot summary.
+
+    mode='cprofile' traces every call of the profiling thread; the collapsed
+    stacks are rebuilt from the caller graph, so they are exact per edge but
+    approximate along deeper paths. mode='sample' snapshots the stacks of all
+    threads every interval seconds, which also covers tab pool and pipeline
+    threads at a much lower overhead. Samples are wall clock, threads parked
+    in a wait (pool workers, the metrics server, the lease keeper) are
+    skipped and only counted as idle.
+    """
+    def __init__(self, name: str, output_dir: str, mode: str = 'sample',
+                 interval: float = 0.005, top: int = 25):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.name = name
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+        self.logger = logging.getLogger(__name__)
+        self.samples: Counter = Counter()
+        self.idle_samples = 0
+        self._profile = None
+        self._sampler = None
+        self._stopped = threading.Event()
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+            self._sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profile:
+            self._profile.disable()
+        else:
+            self._stopped.set()
+            self._sampler.join()
+        self.elapsed = time.perf_counter() - self._start
+        try:
+            self.write()
+        except Exception as e:
+            self.logger.error(f"Failed to write profile: {e}")
+        return False
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    self.idle_samples += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_label(code.co_filename, code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def _collapsed_from_stats(self, stats: pstats.Stats, max_depth: int = 64,
+                              min_share: float = 0.0001) -> Counter:
+        """Spread each function's time over its callers' paths (in microseconds).
+
+        Paths carrying less than min_share seconds are dropped, which keeps
+        the walk bounded on large call graphs.
+        """
+        callees: Dict[tuple, List[Tuple[tuple, float]]] = {}
+        roots = []
+        for func, (_, _, _, cumtime, callers) in stats.stats.items():
+            if not callers:
+                roots.append(func)
+            for caller, (_, _, _, edge_cumtime) in callers.items():
+                callees.setdefault(caller, []).append((func, edge_cumtime))
+
+        collapsed: Counter = Counter()
+
+        def walk(func, share: float, path: Tuple[str, ...]):
+            _, _, tottime, cumtime, _ = stats.stats[func]
+            path = path + (_label(*func),)
+            ratio = share / cumtime if cumtime else 0.0
+            self_time = int(tottime * ratio * 1_000_000)
+            if self_time:
+                collapsed[';'.join(path)] += self_time
+            if len(path) >= max_depth or share < min_share:
+                return
+            for callee, edge_cumtime in callees.get(func, ()):
+                if _label(*callee) in path:
+                    continue
+                walk(callee, edge_cumtime * ratio, path)
+
+        for root in roots:
+            walk(root, stats.stats[root][3], ())
+        return collapsed
+
+    def _hotspots(self) -> Tuple[List[Tuple[str, float, float]], str]:
+        """(label, self, total) rows sorted by self cost, and the unit"""
+        if self._profile:
+            stats = pstats.Stats(self._profile)
+            rows = [
+                (_label(*func), tottime, cumtime)
+                for func, (_, _, tottime, cumtime, _) in stats.stats.items()
+            ]
+            return sorted(rows, key=lambda row: row[1], reverse=True), 's'
+
+        own, total = Counter(), Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        rows = [(frame, own[frame], total[frame]) for frame in total]
+        return sorted(rows, key=lambda row: (row[1], row[2]), reverse=True), 'samples'
+
+    def summary(self) -> str:
+        rows, unit = self._hotspots()
+        lines = [f"Profile of {self.name} ({self.mode}, {self.elapsed:.2f}s wall)"]
+        if not self._profile:
+            lines.append(f"Wall clock samples of running threads, {self.idle_samples} idle thread samples skipped")
+        lines.append('')
+
+        def table(title: str, selected):
+            lines.append(title)
+            lines.append(f"{'self':>12} {'total':>12}  function")
+            for label, own, total in selected[:self.top]:
+                lines.append(f"{own:>12.3f} {total:>12.3f}  {label}" if unit == 's'
+                             else f"{own:>12} {total:>12}  {label}")
+            lines.append('')
+
+        table(f"Top {self.top} by self {unit}", rows)
+        for module in FOCUS_MODULES:
+            table(f"{module}", [row for row in rows if row[0].startswith(module + ':')])
+        return '\n'.join(lines)
+
+    def write(self) -> str:
+        """Write <name>.collapsed, <name>-hotspots.txt (and <name>.pstats), returns the base path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        if self._profile:
+            self._profile.dump_stats(base + '.pstats')
+            collapsed = self._collapsed_from_stats(pstats.Stats(self._profile))
+        else:
+            collapsed = self.samples
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, value in sorted(collapsed.items()):
+                f.write(f"{stack} {value}\n")
+        with open(base + '-hotspots.txt', 'w', encoding='utf-8') as f:
+            f.write(self.summary())
+        self.logger.info(f"Profile written to {base}.collapsed and {base}-hotspots.txt")
+        return base
+
+
+def profiled(name: str, mode: Optional[str], output_dir: str, **kwargs):
+    """Profiler context for mode, or a no-op context when mode is None"""
+    if not mode:
+        return nullcontext()
+    return Profiler(name, output_dir, mode, **kwargs)
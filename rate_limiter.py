@@ -0,0 +1,102 @@
+from typing import Callable, Optional
+import asyncio
+import logging
+import threading
+import time
+
+# Requests per second bounds used when no explicit limits are given
+DEFAULT_MIN_RATE = 0.05
+DEFAULT_MAX_RATE = 5.0
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose refill rate follows AIMD feedback.
+
+    Every page load takes a token first. Successful loads raise the rate by
+    a fixed step, Cloudflare challenges and failed loads cut it by a factor,
+    so the scraper settles near the highest rate the site tolerates.
+    Safe to share between threads (e.g. the tabs of a TabPool).
+    """
+    def __init__(self, initial_rate: float, min_rate: float = DEFAULT_MIN_RATE,
+                 max_rate: float = DEFAULT_MAX_RATE, increase: float = 0.05,
+                 challenge_factor: float = 0.5, failure_factor: float = 0.75,
+                 burst: float = 1.0):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.challenge_factor = challenge_factor
+        self.failure_factor = failure_factor
+        self.burst = burst
+        self._rate = min(max_rate, max(min_rate, initial_rate))
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        self.successes = 0
+        self.challenges = 0
+        self.failures = 0
+
+    @classmethod
+    def from_delay(cls, delay: float, **kwargs) -> 'AdaptiveRateLimiter':
+        """Start at the rate implied by the old fixed --delay, delay 0 starts at max_rate"""
+        return cls(1 / delay if delay else kwargs.get('max_rate', DEFAULT_MAX_RATE), **kwargs)
+
+    @property
+    def rate(self) -> float:
+        """Current allowed requests per second"""
+        return self._rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _take(self) -> float:
+        """Take a token if one is available, else return seconds until the next"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def acquire(self, cancelled: Optional[Callable[[], bool]] = None) -> float:
+        """Block until a request may be made, returns seconds waited"""
+        start = time.monotonic()
+        while True:
+            wait = self._take()
+            if not wait or (cancelled and cancelled()):
+                return time.monotonic() - start
+            # Sleep in short slices so rate changes and cancellation apply quickly
+            time.sleep(min(wait, 0.25))
+
+    async def acquire_async(self) -> float:
+        """acquire() for coroutines, cancelled through the awaiting task"""
+        start = time.monotonic()
+        while True:
+            wait = self._take()
+            if not wait:
+                return time.monotonic() - start
+            await asyncio.sleep(min(wait, 0.25))
+
+    def _set_rate(self, rate: float, reason: str):
+        with self._lock:
+            self._refill()
+            old_rate = self._rate
+            self._rate = min(self.max_rate, max(self.min_rate, rate))
+        if self._rate < old_rate:
+            self.logger.info(f"Rate lowered to {self._rate:.2f} req/s after {reason}")
+        elif self._rate > old_rate:
+            self.logger.debug(f"Rate raised to {self._rate:.2f} req/s")
+
+    def on_success(self):
+        self.successes += 1
+        self._set_rate(self._rate + self.increase, 'success')
+
+    def on_challenge(self):
+        self.challenges += 1
+        self._set_rate(self._rate * self.challenge_factor, 'challenge')
+
+    def on_failure(self):
+        self.failures += 1
+        self._set_rate(self._rate * self.failure_factor, 'failure')
@@ -1,78 +1,76 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from DrissionPage import ChromiumPage, ChromiumOptions
 from CloudflareBypasser import CloudflareBypasser
 from models import ListingData, PropertyDetails, ContactInfo
 from request_manager import RequestProps
+import asyncio
 import logging
+import threading
 import time
-import re
 import random
 import os
+import shutil
+import copy
+import uuid
+from profile_manager import ProfileTemplate
+from rate_limiter import AdaptiveRateLimiter, DEFAULT_MAX_RATE
+from network import NetworkMonitor, DEFAULT_BLOCKED_TYPES
+import listing_parser
+from detail_extractor import extract_detail, parse_detail_html, build_property_details, decode_obfuscated_name
+from http_fetcher import HTTPFetcher
+from normalization import parse_area
+from metrics import registry as metrics
 from requests.exceptions import ConnectionError
 
 MAX_RETRIES = 3
+# Seconds to wait for a page's anchor element before giving up
+READY_TIMEOUT = 10
+# Seconds between readiness checks of the async page loads
+POLL_INTERVAL = 0.05
+
+# Elements that mark each page type as ready
+RESULTS_READY = '#searchResultsTable'
+DETAIL_READY = '@class:classifiedInfoList'
+PAGE_TYPES = {RESULTS_READY: 'results', DETAIL_READY: 'detail'}
 
 class SahibindenScraper:
-    def __init__(self, max_pages: int, delay: int, headless: bool = False):
+    def __init__(self, max_pages: int, delay: int, headless: bool = False,
+                 snapshot_parsing: bool = True, script_extraction: bool = True,
+                 block_resources=DEFAULT_BLOCKED_TYPES, block_patterns=None,
+                 http_details: bool = False, max_rate: float = DEFAULT_MAX_RATE):
         self.options = ChromiumOptions()
         self.headless = headless
+        self.snapshot_parsing = snapshot_parsing and listing_parser.is_available()
+        self.script_extraction = script_extraction
         self.logger = logging.getLogger(__name__)
         self.page_idx = 1
         self.max_pages = max_pages
         self.delay = delay
         self.retry_count = 0
         self.is_stopped = False
+        self.is_tab = False
+        # Shared with tab scrapers opened from this one
+        self.rate_limiter = AdaptiveRateLimiter.from_delay(delay, max_rate=max_rate)
+        # Anchor selector -> (loads, total seconds waited until ready), shared
+        # with tab scrapers and updated from their threads under the lock
+        self.wait_stats = {}
+        self._wait_stats_lock = threading.Lock()
+        self.network = NetworkMonitor(block_resources, block_patterns)
+        # Detail pages over plain HTTP with the browser's cookies, shared with tabs
+        self.http_fetcher = HTTPFetcher() if http_details else None
         self.temp_profile_dir = None  # Initialize here
         
-        # First get Chrome's actual profile path
-        temp_browser = ChromiumPage()
-        chrome_profile_path = None
-        
+        startup_start = time.perf_counter()
+        profile_name = f"scraper_profile_{uuid.uuid4().hex[:8]}"
+        template = ProfileTemplate()
+        self.temp_profile_dir = template.clone_path(profile_name)
+
+        # Clone the cached profile template, built on first use only
         try:
-            # Get chrome://version data
-            temp_browser.get('chrome://version')
-            profile_element = temp_browser.ele('#profile_path')
-            if profile_element:
-                chrome_profile_path = os.path.dirname(profile_element.text.strip())
-                self.logger.info(f"Found Chrome profile path: {chrome_profile_path}")
-            
-            if not chrome_profile_path:
-                # Try to get from command line as fallback
-                cmd_line = temp_browser.ele('#command_line')
-                if cmd_line:
-                    cmd_text = cmd_line.text
-                    user_data_match = re.search(r'--user-data-dir=(.*?)(?:\s|$)', cmd_text)
-                    if user_data_match:
-                        chrome_profile_path = user_data_match.group(1)
+            template.clone(self.temp_profile_dir)
         except Exception as e:
-            self.logger.warning(f"Could not get Chrome profile path: {e}")
-        finally:
-            temp_browser.quit()
-
-        # Create new profile directory based on original Chrome profile
-        import tempfile
-        import uuid
-        import shutil
-        
-        profile_name = f"scraper_profile_{uuid.uuid4().hex[:8]}"
-        self.temp_profile_dir = os.path.join(tempfile.gettempdir(), profile_name)
-        
-        # Copy default profile if we found Chrome's profile path
-        if chrome_profile_path and os.path.exists(chrome_profile_path):
-            try:
-                default_profile = os.path.join(chrome_profile_path, 'Default')
-                if os.path.exists(default_profile):
-                    self.logger.info("Copying default Chrome profile...")
-                    shutil.copytree(
-                        default_profile,
-                        os.path.join(self.temp_profile_dir, 'Default'),
-                        ignore=shutil.ignore_patterns(
-                            'Cache*', 'Service Worker', '*.log', '*.db',
-                            'Network*', 'Media Cache', '*Storage*'
-                        )
-                    )
-            except Exception as e:
-                self.logger.warning(f"Failed to copy Chrome profile: {e}")
+            self.logger.warning(f"Failed to clone profile template: {e}")
+        profile_time = time.perf_counter() - startup_start
         
         # Set Chrome options for the temporary profile
         self.options.set_argument(f'--user-data-dir={self.temp_profile_dir}')
@@ -89,7 +87,19 @@ class SahibindenScraper:
             print("Running in headless mode")
             self.__set_headless(headless)
             
+        browser_start = time.perf_counter()
         self.page = ChromiumPage(self.options)
+        self.startup_times = {
+            'profile': profile_time,
+            'browser': time.perf_counter() - browser_start,
+            'total': time.perf_counter() - startup_start
+        }
+        self.logger.info(
+            f"Browser started in {self.startup_times['total']:.2f}s "
+            f"(profile {self.startup_times['profile']:.2f}s, "
+            f"launch {self.startup_times['browser']:.2f}s)"
+        )
+        self.network.attach(self.page)
         self.cf_bypasser = CloudflareBypasser(self.page)
         self.logger = logging.getLogger(__name__)
         self.page_idx = 1
@@ -112,71 +122,255 @@ class SahibindenScraper:
         
         self.options.headless(headless)
 
-    def __page_loader(self, url: str):
+    def __page_loader(self, url: str, ready_selector: str = None):
         if self.is_stopped:
             return
 
         if self.headless:
-            self.page.set.window.size(800, 600)
-            # Use RequestProps for user agent and headers
-            self.page.set.user_agent(ua=RequestProps.get_random_user_agent())
-            self.page.set.headers(RequestProps.get_random_headers())
-            return self._get_page(url)
-        else:
-            return self._get_page(url)
-
-
-    def _get_page(self, url: str):
+            self._prepare_headless()
+        return self._get_page(url, ready_selector)
+
+    def _prepare_headless(self):
+        self.page.set.window.size(800, 600)
+        # Use RequestProps for user agent and headers
+        self.page.set.user_agent(ua=RequestProps.get_random_user_agent())
+        self.page.set.headers(RequestProps.get_random_headers())
+
+    def _is_redirected(self, url: str) -> bool:
+        """True if the load ended up away from url, e.g. on the login or challenge page"""
+        if self.page.url == url:
+            return False
+        self.logger.info(f"Redirected to: {self.page.url}")
+        self.rate_limiter.on_challenge()
+        metrics.inc('redirects')
+        return True
+
+    def _wait_ready(self, ready_selector: str = None) -> bool:
+        """Wait until the page's anchor element (or the document) is loaded"""
+        if ready_selector:
+            return bool(self.page.wait.eles_loaded(ready_selector, timeout=READY_TIMEOUT))
+        return bool(self.page.wait.doc_loaded(timeout=READY_TIMEOUT))
+
+    def _record_wait(self, ready_selector: str, waited: float):
+        with self._wait_stats_lock:
+            count, total = self.wait_stats.get(ready_selector, (0, 0.0))
+            self.wait_stats[ready_selector] = (count + 1, total + waited)
+        self.logger.debug(f"Page ready after {waited:.2f}s (anchor: {ready_selector})")
+
+    def _get_page(self, url: str, ready_selector: str = None):
         """Get page with retry logic"""
         if self.is_stopped:
             return False
 
         for attempt in range(MAX_RETRIES):
             try:
+                self.rate_limiter.acquire(lambda: self.is_stopped)
+                load_start = time.perf_counter()
                 self.page.get(url)
-                retry = 0
-                while self.page.url_available is False and retry < 10:
-                    time.sleep(1)
-                    retry += 1
+                wait_start = time.perf_counter()
+                if not self.page.url_available:
+                    self.page.wait.doc_loaded(timeout=READY_TIMEOUT)
                 
                 if not self.page.url_available:
                     raise ConnectionError("Page not available after timeout")
 
-                self.cf_bypasser.bypass()
+                bypass_time = 0.0
+                if not self.cf_bypasser.is_bypassed():
+                    self.rate_limiter.on_challenge()
+                    self.network.record(self.page, 'challenge')
+                    metrics.inc('challenges')
+                    bypass_start = time.perf_counter()
+                    passed = self.cf_bypasser.bypass()
+                    bypass_time = time.perf_counter() - bypass_start
+                    metrics.observe('cloudflare_bypass', bypass_time)
+                    if not passed:
+                        # The challenge page keeps the url, it must not be parsed as the page
+                        raise ConnectionError("Challenge not passed")
+
+                if not self._wait_ready(ready_selector):
+                    self.logger.warning(f"Anchor {ready_selector} not found within {READY_TIMEOUT}s")
+                self._record_wait(ready_selector, time.perf_counter() - wait_start)
+                metrics.observe('page_load', time.perf_counter() - load_start - bypass_time)
+                metrics.inc('pages_loaded')
+                self.network.record(self.page, PAGE_TYPES.get(ready_selector, 'other'))
                 
-                if self.page.url != url:
-                    self.logger.info(f"Redirected to: {self.page.url}")
+                if self._is_redirected(url):
                     self.cf_bypasser.bypass()
-                    time.sleep(self.delay)
+                    # Wait for the lowered rate instead of a fixed delay
+                    self.rate_limiter.acquire(lambda: self.is_stopped)
                     if not self.headless:  # Only ask for input in non-headless mode
                         self.logger.info("Waiting user to proceed, Please type 'y' to continue")
                         inp = input()
                         if inp == 'y':
-                            return self._get_page(url)
+                            return self._get_page(url, ready_selector)
+                    return True
+                self.rate_limiter.on_success()
+                if self.http_fetcher and not self.http_fetcher.ready:
+                    # The browser is through the challenge, hand its cookies over
+                    self.http_fetcher.load_from(self.page)
                 return True
 
             except Exception as e:
                 self.logger.error(f"Attempt {attempt + 1}/{MAX_RETRIES} failed: {str(e)}")
+                # The lowered rate spaces out the retry on the next acquire
+                self.rate_limiter.on_failure()
                 if attempt < MAX_RETRIES - 1:
-                    time.sleep(self.delay * 2)  # Increase delay between retries
+                    metrics.inc('retries')
                     try:
-                        # Try to refresh the page connection
+                        # Try to refresh the page connection, the refresh is a request as well
+                        self.rate_limiter.acquire(lambda: self.is_stopped)
                         self.page.refresh()
                     except:
                         pass
                 else:
                     self.logger.error("Max retries reached, giving up")
+                    metrics.inc('failures')
                     return False
         return False
 
+    async def _navigate_async(self, url: str) -> bool:
+        """Start a navigation without waiting for it, then poll until the new document is complete.
+
+        Page.navigate is sent fire-and-forget and DrissionPage's own event
+        listener keeps ready_state up to date, so the event loop is only held
+        for the short local CDP calls and other tabs load meanwhile. The
+        old document reports complete until it is replaced, even when the
+        tab already shows url, so the wait is for a new timeOrigin first.
+        """
+        old_origin = self._time_origin()
+        self.page.run_cdp('Page.navigate', url=url, _timeout=0)
+        deadline = time.monotonic() + READY_TIMEOUT
+        while self._time_origin() in (old_origin, None):
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(POLL_INTERVAL)
+        while self.page.states.ready_state != 'complete':
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(POLL_INTERVAL)
+        return True
+
+    def _time_origin(self) -> Optional[float]:
+        """performance.timeOrigin of the current document, None while it is being swapped"""
+        try:
+            result = self.page.run_cdp('Runtime.evaluate', expression='performance.timeOrigin',
+                                       returnByValue=True)
+            return result['result'].get('value')
+        except Exception:
+            return None
+
+    async def _wait_ready_async(self, ready_selector: str = None) -> bool:
+        if not ready_selector:
+            return True
+        deadline = time.monotonic() + READY_TIMEOUT
+        while not self.page.ele(ready_selector, timeout=0):
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(POLL_INTERVAL)
+        return True
+
+    async def _get_page_async(self, url: str, ready_selector: str = None) -> bool:
+        """_get_page for coroutines, several tabs can wait on their loads at once"""
+        for attempt in range(MAX_RETRIES):
+            if self.is_stopped:
+                return False
+            try:
+                if self.headless:
+                    self._prepare_headless()
+                await self.rate_limiter.acquire_async()
+                load_start = time.perf_counter()
+                if not await self._navigate_async(url):
+                    raise ConnectionError("Page not loaded after timeout")
+
+                bypass_time = 0.0
+                if not self.cf_bypasser.is_bypassed():
+                    self.rate_limiter.on_challenge()
+                    self.network.record(self.page, 'challenge')
+                    metrics.inc('challenges')
+                    bypass_start = time.perf_counter()
+                    # Clicking through the challenge is rare and sleeps internally
+                    passed = await asyncio.to_thread(self.cf_bypasser.bypass)
+                    bypass_time = time.perf_counter() - bypass_start
+                    metrics.observe('cloudflare_bypass', bypass_time)
+                    if not passed:
+                        # The challenge page keeps the url, it must not be parsed as the page
+                        raise ConnectionError("Challenge not passed")
+
+                wait_start = time.perf_counter()
+                if not await self._wait_ready_async(ready_selector):
+                    self.logger.warning(f"Anchor {ready_selector} not found within {READY_TIMEOUT}s")
+                self._record_wait(ready_selector, time.perf_counter() - wait_start)
+                metrics.observe('page_load', time.perf_counter() - load_start - bypass_time)
+                metrics.inc('pages_loaded')
+                self.network.record(self.page, PAGE_TYPES.get(ready_selector, 'other'))
+
+                if self._is_redirected(url):
+                    # Nobody can confirm a login prompt here, leave the page unparsed
+                    await asyncio.to_thread(self.cf_bypasser.bypass)
+                    self.logger.error(f"Could not load {url}, skipping it")
+                    return False
+                self.rate_limiter.on_success()
+                if self.http_fetcher and not self.http_fetcher.ready:
+                    self.http_fetcher.load_from(self.page)
+                return True
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Attempt {attempt + 1}/{MAX_RETRIES} failed: {str(e)}")
+                self.rate_limiter.on_failure()
+                if attempt < MAX_RETRIES - 1:
+                    metrics.inc('retries')
+                else:
+                    self.logger.error("Max retries reached, giving up")
+                    metrics.inc('failures')
+        return False
+
     def scrape_listing_page(self, url: str) -> List[ListingData]:
         if self.is_stopped:
             return []
             
-        if not self.__page_loader(url):
+        if not self.__page_loader(url, RESULTS_READY):
             self.logger.error("Failed to load page")
             return []
-            
+
+        with metrics.timer('listing_parse'):
+            return self._parse_listing_page()
+
+    async def scrape_listing_page_async(self, url: str) -> List[ListingData]:
+        if self.is_stopped:
+            return []
+
+        if not await self._get_page_async(url, RESULTS_READY):
+            self.logger.error("Failed to load page")
+            return []
+
+        with metrics.timer('listing_parse'):
+            return self._parse_listing_page()
+
+    def _parse_listing_page(self) -> List[ListingData]:
+        if self.snapshot_parsing:
+            try:
+                parse_start = time.perf_counter()
+                listings = listing_parser.parse_listing_rows(self.page.html, self.page.url)
+                self.logger.debug(
+                    f"Parsed {len(listings)} listings from snapshot in "
+                    f"{(time.perf_counter() - parse_start) * 1000:.1f}ms"
+                )
+                return listings
+            except Exception as e:
+                self.logger.warning(f"Snapshot parsing failed, falling back to DOM queries: {e}")
+
+        return self._scrape_listing_rows_dom()
+
+    def count_results(self, url: str) -> Optional[int]:
+        """Load the first results page of a search and read its total result count"""
+        if not self.__page_loader(url, RESULTS_READY):
+            return None
+        return listing_parser.parse_result_count(self.page.html)
+
+    def _scrape_listing_rows_dom(self) -> List[ListingData]:
+        """Parse the results table with one element query per field"""
         listings = []
         
         # First get the table
@@ -212,11 +406,12 @@ class SahibindenScraper:
                 if not title_element:
                     continue
 
+                attribute_values = item.eles('@class=searchResultsAttributeValue')
                 listing = ListingData(
                     listing_id=item.attr('data-id'),
                     title=title_element.text.strip(),
-                    size_m2=float(item.eles('@class=searchResultsAttributeValue')[0].text.replace('m²', '').strip()),
-                    room_count=item.eles('@class=searchResultsAttributeValue')[1].text.strip(),
+                    size_m2=parse_area(attribute_values[0].text) or 0.0,
+                    room_count=attribute_values[1].text.strip(),
                     price=item.ele('@class=searchResultsPriceValue').text.strip(),
                     date=item.ele('@class:searchResultsDateValue').text.replace('\n', ' ').strip(),
                     location=item.ele('@class:searchResultsLocationValue').text.replace('\n', ' ').strip(),
@@ -253,10 +448,70 @@ class SahibindenScraper:
     def scrape_detail_page(self, url: str) -> tuple[PropertyDetails, ContactInfo]:
         if self.is_stopped:
             return None, None
+
+        if self.http_fetcher and self.http_fetcher.ready:
+            details = self._fetch_detail_http(url)
+            if details:
+                return details
             
-        if not self.__page_loader(url):
+        if not self.__page_loader(url, DETAIL_READY):
+            self.logger.error("Failed to load detail page")
+            return None, None
+
+        with metrics.timer('detail_parse'):
+            return self._parse_detail_page()
+
+    async def scrape_detail_page_async(self, url: str) -> tuple[PropertyDetails, ContactInfo]:
+        if self.is_stopped:
+            return None, None
+
+        if self.http_fetcher and self.http_fetcher.ready:
+            # requests has no async client, the fetch runs in the default executor
+            details = await asyncio.to_thread(self._fetch_detail_http, url)
+            if details:
+                return details
+
+        if not await self._get_page_async(url, DETAIL_READY):
             self.logger.error("Failed to load detail page")
             return None, None
+
+        with metrics.timer('detail_parse'):
+            return self._parse_detail_page()
+
+    def _fetch_detail_http(self, url: str) -> Optional[tuple[PropertyDetails, ContactInfo]]:
+        """Fetch and parse a detail page without the browser, None to fall back to it"""
+        self.rate_limiter.acquire(lambda: self.is_stopped)
+        if self.is_stopped:
+            return None
+        fetch_start = time.perf_counter()
+        page_html = self.http_fetcher.fetch(url, referer=self.page.url)
+        if page_html is None:
+            if not self.http_fetcher.ready:
+                self.rate_limiter.on_challenge()
+                metrics.inc('challenges')
+            metrics.inc('http_fallbacks')
+            return None
+        metrics.observe('http_fetch', time.perf_counter() - fetch_start)
+
+        try:
+            with metrics.timer('detail_parse'):
+                details = parse_detail_html(page_html)
+        except Exception as e:
+            self.logger.warning(f"Parsing HTTP fetched detail page failed, using the browser: {e}")
+            metrics.inc('http_fallbacks')
+            return None
+        self.rate_limiter.on_success()
+        metrics.inc('http_fetches')
+        return details
+
+    def _parse_detail_page(self) -> tuple[PropertyDetails, ContactInfo]:
+        if self.script_extraction:
+            try:
+                property_details, contact_info = extract_detail(self.page)
+                self.logger.debug(f"Extracted details with page script: {property_details}, {contact_info}")
+                return property_details, contact_info
+            except Exception as e:
+                self.logger.warning(f"Script extraction failed, falling back to DOM queries: {e}")
             
         # Extract property details
         details = {}
@@ -271,27 +526,9 @@ class SahibindenScraper:
                 value = span.text
                 details[label] = value
 
-        property_details = PropertyDetails(
-            gross_area=float(details.get('m² (Brüt)', '0').replace('m²', '').strip()),
-            net_area=float(details.get('m² (Net)', '0').replace('m²', '').strip()),
-            room_count=details.get('Oda Sayısı', '').strip(),
-            building_age=details.get('Bina Yaşı', '').strip(),
-            floor=details.get('Bulunduğu Kat', '').strip(),
-            total_floors=int(details.get('Kat Sayısı', '0').strip()),
-            heating=details.get('Isıtma', '').strip(),
-            bathroom_count=int(details.get('Banyo Sayısı', '0').strip()),
-            balcony='Var' in details.get('Balkon', '').strip(),
-            elevator='Var' in details.get('Asansör', '').strip(),
-            parking=details.get('Otopark', '').strip(),
-            furnished='Var' in details.get('Eşyalı', '').strip(),
-            usage_status=details.get('Kullanım Durumu', '').strip(),
-            in_complex='Var' in details.get('Site İçerisinde', '').strip(),
-            maintenance_fee=details.get('Aidat', '').strip(),
-            credit_eligible='Var' in details.get('Krediye Uygun', '').strip(),
-            deed_status=details.get('Tapu Durumu', '').strip(),
-            listed_by=details.get('Kimden', '').strip(),
-            exchangeable='Var' in details.get('Takas', '').strip(),
-            description=self._safe_extract(self.page, '@id:classifiedDescription', 'inner_html').strip()
+        property_details = build_property_details(
+            details,
+            self._safe_extract(self.page, '@id:classifiedDescription', 'inner_html')
         )
 
         self.logger.debug(f"Extracted property details: {property_details}")
@@ -339,15 +576,7 @@ class SahibindenScraper:
             agent_name_inner_html = self.page.ele("@class:sticky-header-store-information-text")
             agent_name = agent_name_inner_html.inner_html if agent_name_inner_html else ''
             
-            # Updated regex pattern
-            css_class = re.search(r'<span class="(css[a-f0-9\-]+)"', agent_name)
-            if css_class:
-                class_name = css_class.group(1)
-                content_regex = f'<style>\.{class_name}:before {{content: \'([^\']+)\';}}</style>'
-                match = re.search(content_regex, agent_name)
-                agent_name = match.group(1) if match else ''
-            else:
-                agent_name = ''
+            agent_name = decode_obfuscated_name(agent_name)
             
             self.logger.debug(f"Extracted agent name: {agent_name}")
 
@@ -412,7 +641,7 @@ class SahibindenScraper:
             return ''
 
         if url:
-            self._get_page(url)
+            self._get_page(url, RESULTS_READY)
 
         page_nav = self.page.ele('tag:ul@@class:pageNaviButtons')
         if not page_nav:
@@ -429,9 +658,31 @@ class SahibindenScraper:
         return ''
     
 
+    def open_tab(self) -> 'SahibindenScraper':
+        """Create a scraper bound to a new tab of the same browser"""
+        tab_scraper = copy.copy(self)
+        tab_scraper.page = self.page.new_tab()
+        self.network.attach(tab_scraper.page)
+        tab_scraper.cf_bypasser = CloudflareBypasser(tab_scraper.page)
+        tab_scraper.is_tab = True
+        tab_scraper.temp_profile_dir = None
+        return tab_scraper
+
     def close(self):
         """Safely close browser and cleanup temp profile"""
         self.is_stopped = True
+        if self.is_tab:
+            # Tabs share the browser and profile of their parent scraper
+            try:
+                self.page.close()
+            except:
+                pass
+            finally:
+                self.page = None
+            return
+        self.logger.info(f"Network usage: {self.network.summary()}")
+        if self.http_fetcher:
+            self.http_fetcher.close()
         try:
             if hasattr(self, 'page') and self.page:
                 try:
@@ -443,7 +694,6 @@ class SahibindenScraper:
                 
             # Cleanup temporary profile directory
             if hasattr(self, 'temp_profile_dir') and os.path.exists(self.temp_profile_dir):
-                import shutil
                 try:
                     shutil.rmtree(self.temp_profile_dir)
                 except Exception as e:
@@ -0,0 +1,209 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+import argparse
+import heapq
+import mmap
+import os
+import re
+import threading
+
+LISTING_ID_FROM_URL = re.compile(r'-(\d+)/detay')
+
+# Ids written per chunk when merging large sets
+CHUNK_SIZE = 1 << 16
+
+
+def to_id(listing_id) -> Optional[int]:
+    """Numeric listing id, None for ids that are not plain numbers"""
+    if isinstance(listing_id, int):
+        return listing_id
+    if isinstance(listing_id, str) and listing_id.strip().isdigit():
+        return int(listing_id)
+    return None
+
+
+def id_from_url(url: str) -> Optional[int]:
+    """Listing id of a detail URL such as /ilan/emlak-konut-satilik-1234567890/detay"""
+    match = LISTING_ID_FROM_URL.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+class SeenIDSet:
+    """Persistent set of numeric listing ids.
+
+    The ids live on disk as a sorted array of native uint64 that is
+    memory-mapped, so lookups are a binary search over the page cache and
+    5M ids take 40 MB of disk instead of gigabytes of Python strings.
+    New ids go to a small in-memory set backed by an append-only journal
+    and are merged into the sorted file once merge_threshold is reached.
+    """
+    def __init__(self, path: str, merge_threshold: int = 100000):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.merge_threshold = merge_threshold
+        self._lock = threading.RLock()
+        self._pending = set()
+        self._mmap = None
+        self._ids = memoryview(array('Q'))
+        self._map()
+        self._load_journal()
+        self._journal = open(self.journal_path, 'ab', buffering=0)
+
+    def _map(self):
+        self._unmap()
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._ids = memoryview(self._mmap).cast('Q')
+
+    def _unmap(self):
+        self._ids.release()
+        self._ids = memoryview(array('Q'))
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _load_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        journal = array('Q')
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+        # Drop a partially written trailing id
+        journal.frombytes(data[:len(data) - len(data) % journal.itemsize])
+        self._pending.update(journal)
+
+    def _on_disk(self, value: int) -> bool:
+        index = bisect_left(self._ids, value)
+        return index < len(self._ids) and self._ids[index] == value
+
+    def __contains__(self, listing_id) -> bool:
+        value = to_id(listing_id)
+        if value is None:
+            return False
+        with self._lock:
+            return value in self._pending or self._on_disk(value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids) + len(self._pending)
+
+    def __iter__(self) -> Iterator[int]:
+        """Ids in ascending order, streamed from the mapped file; the set is locked meanwhile"""
+        with self._lock:
+            yield from heapq.merge(self._ids, sorted(self._pending))
+
+    def add(self, listing_id) -> bool:
+        """Add an id, returns False if it was already seen or is not numeric"""
+        return self.update([listing_id]) == 1
+
+    def update(self, listing_ids: Iterable) -> int:
+        """Add many ids with one journal write, returns how many were new"""
+        with self._lock:
+            new = array('Q')
+            for listing_id in listing_ids:
+                value = to_id(listing_id)
+                if value is None or value in self._pending or self._on_disk(value):
+                    continue
+                self._pending.add(value)
+                new.append(value)
+            if new:
+                self._journal.write(new.tobytes())
+            if len(self._pending) >= self.merge_threshold:
+                self.merge()
+            return len(new)
+
+    def _replace(self, write):
+        """Rewrite the sorted file through write(f), then remap it"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self._unmap()
+        os.replace(tmp_path, self.path)
+        self._map()
+
+    def merge(self):
+        """Fold pending ids into the sorted file and empty the journal"""
+        with self._lock:
+            if not self._pending:
+                return
+            new = sorted(self._pending)
+            ids = self._ids
+
+            def write(f):
+                # Copy untouched runs of the old file in bulk between new ids
+                start = 0
+                for value in new:
+                    index = bisect_left(ids, value, start)
+                    f.write(ids[start:index])
+                    f.write(array('Q', (value,)))
+                    start = index
+                f.write(ids[start:])
+
+            self._replace(write)
+            self._pending.clear()
+            self._journal.truncate(0)
+
+    def merge_file(self, other_path: str) -> int:
+        """Bulk union with another id set file, returns the number of ids added"""
+        with self._lock:
+            self.merge()
+            before = len(self._ids)
+            other = SeenIDSet(other_path)
+            try:
+                other.merge()
+                ids = self._ids
+
+                def write(f):
+                    chunk = array('Q')
+                    last = None
+                    for value in heapq.merge(ids, other._ids):
+                        if value == last:
+                            continue
+                        chunk.append(value)
+                        last = value
+                        if len(chunk) >= CHUNK_SIZE:
+                            f.write(chunk)
+                            chunk = array('Q')
+                    f.write(chunk)
+
+                self._replace(write)
+            finally:
+                other.close()
+            return len(self._ids) - before
+
+    def clear(self):
+        with self._lock:
+            self._unmap()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._pending.clear()
+            self._journal.truncate(0)
+
+    def close(self):
+        with self._lock:
+            self.merge()
+            self._journal.close()
+            self._unmap()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and merge seen listing id sets")
+    parser.add_argument("path", help="Seen id set file")
+    parser.add_argument("--merge", nargs='+', metavar="SOURCE", help="Add the ids of other sets")
+    args = parser.parse_args()
+
+    seen = SeenIDSet(args.path)
+    try:
+        for source in args.merge or ():
+            print(f"Merged {seen.merge_file(source)} new ids from {source}")
+        print(f"{args.path}: {len(seen)} ids")
+    finally:
+        seen.close()
+
+
+if __name__ == "__main__":
+    main()
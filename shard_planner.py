@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import logging
+
+# Results the site lists for one search before pagination stops
+PAGINATION_CAP = 1000
+# Upper bound tried first when splitting an open ended price band
+DEFAULT_PIVOT = 1_000_000
+# Bands narrower than this are not split further
+MIN_BAND = 1_000
+
+
+@dataclass
+class Shard:
+    url: str
+    price_min: Optional[int] = None
+    price_max: Optional[int] = None
+    result_count: Optional[int] = None
+    status: str = 'pending'
+    current_page: int = 1
+    next_url: Optional[str] = None
+
+
+def with_price_band(url: str, price_min: Optional[int], price_max: Optional[int]) -> str:
+    """Search URL restricted to a price band, other query parameters are kept"""
+    parts = urlsplit(url)
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in ('price_min', 'price_max', 'pagingOffset')
+    ]
+    if price_min is not None:
+        query.append(('price_min', str(price_min)))
+    if price_max is not None:
+        query.append(('price_max', str(price_max)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _price_param(url: str, name: str) -> Optional[int]:
+    for key, value in parse_qsl(urlsplit(url).query):
+        if key == name and value.isdigit():
+            return int(value)
+    return None
+
+
+class ShardPlanner:
+    """Splits a search into price bands that each fit under the pagination cap.
+
+    count_results(url) loads the first results page of a search and returns
+    its total result count. Bands over the cap are halved recursively, an
+    open ended upper band is cut at a pivot that doubles as it moves up.
+    """
+    def __init__(self, count_results: Callable[[str], Optional[int]], cap: int = PAGINATION_CAP,
+                 min_band: int = MIN_BAND, max_shards: int = 500):
+        self.count_results = count_results
+        self.cap = cap
+        self.min_band = min_band
+        self.max_shards = max_shards
+        self.logger = logging.getLogger(__name__)
+
+    def plan(self, url: str) -> List[Shard]:
+        price_min = _price_param(url, 'price_min') or 0
+        price_max = _price_param(url, 'price_max')
+        shards: List[Shard] = []
+        bands = [(price_min, price_max)]
+        while bands:
+            low, high = bands.pop(0)
+            shard_url = with_price_band(url, low or None, high)
+            count = self.count_results(shard_url)
+            if count == 0:
+                continue
+            if count is None or count <= self.cap or len(shards) + len(bands) >= self.max_shards:
+                if count is None:
+                    self.logger.warning(f"Could not read the result count of {shard_url}, not splitting")
+                shards.append(Shard(shard_url, low or None, high, count))
+                continue
+
+            if high is None:
+                pivot = max(low * 2, DEFAULT_PIVOT)
+                bands[:0] = [(low, pivot), (pivot + 1, None)]
+            elif high - low <= self.min_band:
+                self.logger.warning(
+                    f"{count} results between {low} and {high} TL exceed the cap of {self.cap}, "
+                    f"the shard will be truncated"
+                )
+                shards.append(Shard(shard_url, low or None, high, count))
+            else:
+                middle = (low + high) // 2
+                bands[:0] = [(low, middle), (middle + 1, high)]
+
+        total = sum(shard.result_count or 0 for shard in shards)
+        self.logger.info(f"Planned {len(shards)} shards covering {total} results")
+        return shards
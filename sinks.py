@@ -0,0 +1,183 @@
+from typing import Dict, Iterator, List, Optional
+import glob
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _split_base(base_path: str):
+    """'dir/continuous_data.jsonl' -> ('dir/continuous_data', '.jsonl')"""
+    root, ext = os.path.splitext(base_path)
+    return root, ext or '.jsonl'
+
+
+def segment_paths(base_path: str) -> List[str]:
+    """All segments written for base_path, oldest first"""
+    root, ext = _split_base(base_path)
+    pattern = re.compile(re.escape(os.path.basename(root)) + r'-(\d+)' + re.escape(ext) + r'(\.gz|\.zst)?$')
+    segments = []
+    for path in glob.glob(f'{glob.escape(root)}-*{ext}*'):
+        match = pattern.match(os.path.basename(path))
+        if match:
+            segments.append((int(match.group(1)), path))
+    return [path for _, path in sorted(segments)]
+
+
+def _open_segment_for_read(path: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ValueError("zstandard is required to read .zst segments")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """Yield records from one segment, or every segment of a base path.
+
+    A truncated last line, left behind by a crash mid-write, is skipped.
+    """
+    paths = [path] if os.path.exists(path) else segment_paths(path)
+    logger = logging.getLogger(__name__)
+    for segment in paths:
+        try:
+            with _open_segment_for_read(segment) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping corrupt line in {segment}")
+        except (EOFError, gzip.BadGzipFile) as e:
+            logger.warning(f"Segment {segment} ends unexpectedly: {e}")
+
+
+class JSONLSink:
+    """Append-only newline delimited JSON sink.
+
+    Keeps a single buffered handle open and starts a new segment once the
+    current one is larger than max_bytes or older than max_age seconds.
+    Segments are named '<name>-000001.jsonl' next to base_path, optionally
+    gzip or zstd compressed.
+    """
+    def __init__(self, base_path: str, max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None, compression: Optional[str] = None,
+                 fsync_interval: Optional[float] = None, buffer_size: int = 1024 * 1024):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstandard is required for zstd compression")
+
+        self.base_path = base_path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compression = compression
+        self.fsync_interval = fsync_interval
+        self.buffer_size = buffer_size
+        self.logger = logging.getLogger(__name__)
+
+        self._raw = None
+        self._stream = None
+        self._segment_index = 0
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._last_sync = 0.0
+
+    @property
+    def current_segment(self) -> Optional[str]:
+        return self._raw.name if self._raw else None
+
+    def _next_segment_path(self) -> str:
+        existing = segment_paths(self.base_path)
+        if existing and not self._segment_index:
+            match = re.search(r'-(\d+)\.', os.path.basename(existing[-1]))
+            self._segment_index = int(match.group(1))
+        self._segment_index += 1
+        root, ext = _split_base(self.base_path)
+        return f'{root}-{self._segment_index:06d}{ext}{COMPRESSION_SUFFIXES[self.compression]}'
+
+    def _open_segment(self):
+        path = self._next_segment_path()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._raw = open(path, 'ab', buffering=self.buffer_size)
+        if self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='ab')
+        elif self.compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self._segment_bytes = 0
+        self._segment_opened = self._last_sync = time.monotonic()
+        self.logger.info(f"Writing to segment {path}")
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes and self._segment_bytes >= self.max_bytes:
+            return True
+        if self.max_age and time.monotonic() - self._segment_opened >= self.max_age:
+            return True
+        return False
+
+    def write(self, record: Dict):
+        if self._raw and self._should_rotate():
+            self.close()
+        if not self._raw:
+            self._open_segment()
+
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        self._stream.write(line)
+        self._segment_bytes += len(line)
+
+        if self.fsync_interval is not None and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def flush(self):
+        if not self._raw:
+            return
+        if self._stream is not self._raw:
+            self._stream.flush()
+        self._raw.flush()
+
+    def sync(self):
+        """Flush buffers and fsync the current segment"""
+        if not self._raw:
+            return
+        self.flush()
+        os.fsync(self._raw.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Finish the current segment, the next write opens a new one"""
+        if not self._raw:
+            return
+        try:
+            if self._stream is not self._raw:
+                self._stream.close()
+            self._raw.flush()
+            if self.fsync_interval is not None:
+                os.fsync(self._raw.fileno())
+        finally:
+            self._raw.close()
+            self._raw = self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,9 +1,16 @@
 import json
 import pickle
 import os
-from dataclasses import dataclass, asdict
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict, field, fields
 from typing import List, Optional
 from datetime import datetime
+from seen_ids import SeenIDSet, id_from_url, to_id
+from rate_limiter import DEFAULT_MAX_RATE
+from shard_planner import Shard, PAGINATION_CAP
+from metrics import registry as metrics
 
 @dataclass
 class ScraperState:
@@ -18,21 +25,52 @@ class ScraperState:
     # Add scraper arguments
     max_pages: int = 1
     delay: float = 1.5
+    max_rate: float = DEFAULT_MAX_RATE
     headless: bool = False
+    concurrency: int = 1
+    pipeline: bool = False
+    queue_size: int = 50
+    block_resources: List[str] = field(default_factory=lambda: ['image', 'font', 'media'])
+    block_patterns: Optional[List[str]] = None
+    skip_unchanged: bool = False
+    fingerprint_db: Optional[str] = None
+    http_details: bool = False
+    shard: bool = False
+    shard_cap: int = PAGINATION_CAP
+    shards: List[dict] = field(default_factory=list)
+    metrics_port: Optional[int] = None
+    metrics_file: Optional[str] = None
+
+def read_json_state(state_file: str) -> ScraperState:
+    """Parse a state file written by the JSON StateManager"""
+    with open(state_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['start_time'] = datetime.fromisoformat(data['start_time'])
+    data['last_update'] = datetime.fromisoformat(data['last_update'])
+    return ScraperState(**data)
 
 class StateManager:
-    def __init__(self, state_file="scraper_state.json"):
+    def __init__(self, state_file="scraper_state.json", seen_ids_file: str = None):
         self.state_file = state_file
         self.state = None
+        # A seen id set given explicitly is shared across runs and searches
+        # and never cleared, the default one belongs to this state file
+        self.shared_seen_ids = seen_ids_file is not None
+        self.seen_ids = SeenIDSet(seen_ids_file or os.path.splitext(state_file)[0] + '.seen')
         self.load_state()
+        if self.state and not len(self.seen_ids):
+            # States written before the id set existed only know their URLs
+            self.seen_ids.update(id_from_url(url) for url in self.state.processed_urls)
 
     def initialize_state(self, url: str, **kwargs):
         """Initialize state with optional scraper arguments"""
+        if not self.shared_seen_ids:
+            self.seen_ids.clear()
         self.state = ScraperState(
             url=url,
             current_page=1,
             last_processed_id=None,
-            processed_urls=[],
+            processed_urls=self._new_processed_urls(),
             total_processed=0,
             start_time=datetime.now(),
             last_update=datetime.now(),
@@ -40,20 +78,33 @@ class StateManager:
             # Add scraper arguments with defaults
             max_pages=kwargs.get('max_pages', 1),
             delay=kwargs.get('delay', 1.5),
-            headless=kwargs.get('headless', False)
+            max_rate=kwargs.get('max_rate') or DEFAULT_MAX_RATE,
+            headless=kwargs.get('headless', False),
+            concurrency=kwargs.get('concurrency', 1),
+            pipeline=kwargs.get('pipeline', False),
+            queue_size=kwargs.get('queue_size', 50),
+            block_resources=list(kwargs.get('block_resources', ['image', 'font', 'media'])),
+            block_patterns=kwargs.get('block_patterns'),
+            skip_unchanged=kwargs.get('skip_unchanged', False),
+            fingerprint_db=kwargs.get('fingerprint_db'),
+            http_details=kwargs.get('http_details', False),
+            shard=kwargs.get('shard', False),
+            shard_cap=kwargs.get('shard_cap') or PAGINATION_CAP,
+            metrics_port=kwargs.get('metrics_port'),
+            metrics_file=kwargs.get('metrics_file')
         )
         self.save_state()
 
+    def _new_processed_urls(self):
+        """Empty processed URL collection for a fresh state"""
+        return []
+
     def load_state(self) -> Optional[ScraperState]:
         """Load state from file if exists"""
         try:
             if os.path.exists(self.state_file):
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    data['start_time'] = datetime.fromisoformat(data['start_time'])
-                    data['last_update'] = datetime.fromisoformat(data['last_update'])
-                    self.state = ScraperState(**data)
-                    return self.state
+                self.state = read_json_state(self.state_file)
+                return self.state
         except Exception as e:
             print(f"Error loading state: {e}")
         return None
@@ -63,7 +114,7 @@ class StateManager:
         if self.state:
             self.state.last_update = datetime.now()
             try:
-                with open(self.state_file, 'w', encoding='utf-8') as f:
+                with metrics.timer('state_save'), open(self.state_file, 'w', encoding='utf-8') as f:
                     state_dict = asdict(self.state)
                     state_dict['start_time'] = state_dict['start_time'].isoformat()
                     state_dict['last_update'] = state_dict['last_update'].isoformat()
@@ -76,6 +127,7 @@ class StateManager:
         if self.state:
             self.state.last_processed_id = listing_id
             self.state.processed_urls.append(listing_url)
+            self.seen_ids.add(listing_id)
             self.state.total_processed += 1
             self.save_state()
 
@@ -90,11 +142,38 @@ class StateManager:
         if self.state:
             self.state.is_completed = True
             self.save_state()
+        self.seen_ids.merge()
 
     def should_process_url(self, url: str) -> bool:
         """Check if URL should be processed or was already done"""
         return self.state and url not in self.state.processed_urls
 
+    def get_shards(self) -> List[Shard]:
+        """Planned shards of a sharded crawl, empty until planned"""
+        if not self.state:
+            return []
+        return [Shard(**shard) for shard in self.state.shards]
+
+    def set_shards(self, shards: List[Shard]):
+        if self.state:
+            self.state.shards = [asdict(shard) for shard in shards]
+            self.save_state()
+
+    def update_shard(self, index: int, **changes):
+        """Record the status or page position of one shard"""
+        if self.state:
+            self.state.shards[index].update(changes)
+            self.save_state()
+
+    def is_processed(self, listing_id: str, url: str) -> bool:
+        """Check a listing against the seen id set, non numeric ids fall back to URLs"""
+        if to_id(listing_id) is not None:
+            return listing_id in self.seen_ids
+        return bool(self.state) and url in self.state.processed_urls
+
+    def close(self):
+        self.seen_ids.close()
+
     def get_resume_info(self) -> tuple[int, str, List[str]]:
         """Get info needed to resume scraping"""
         if self.state:
@@ -112,5 +191,179 @@ class StateManager:
         return {
             'max_pages': self.state.max_pages,
             'delay': self.state.delay,
-            'headless': self.state.headless
+            'max_rate': self.state.max_rate,
+            'headless': self.state.headless,
+            'concurrency': self.state.concurrency,
+            'pipeline': self.state.pipeline,
+            'queue_size': self.state.queue_size,
+            'block_resources': self.state.block_resources,
+            'block_patterns': self.state.block_patterns,
+            'skip_unchanged': self.state.skip_unchanged,
+            'fingerprint_db': self.state.fingerprint_db,
+            'http_details': self.state.http_details,
+            'shard': self.state.shard,
+            'shard_cap': self.state.shard_cap,
+            'metrics_port': self.state.metrics_port,
+            'metrics_file': self.state.metrics_file
         }
+
+
+class ProcessedURLs:
+    """List-like view over the indexed processed_urls table"""
+    def __init__(self, manager: 'SQLiteStateManager'):
+        self.manager = manager
+
+    def append(self, url: str, listing_id: str = None):
+        self.manager._execute(
+            "INSERT OR IGNORE INTO processed_urls (url, listing_id, processed_at) VALUES (?, ?, ?)",
+            (url, listing_id, time.time())
+        )
+
+    def __contains__(self, url) -> bool:
+        return self.manager._execute(
+            "SELECT 1 FROM processed_urls WHERE url = ?", (url,)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.manager._execute("SELECT COUNT(*) FROM processed_urls").fetchone()[0]
+
+    def __iter__(self):
+        rows = self.manager._execute("SELECT url FROM processed_urls ORDER BY processed_at").fetchall()
+        return (row[0] for row in rows)
+
+
+class SQLiteStateManager(StateManager):
+    """State backend on SQLite in WAL mode.
+
+    Processed URLs live in an indexed table so membership checks stay
+    constant time, and progress updates are committed in batches instead of
+    rewriting the whole state on every listing. Keeps the StateManager API.
+    """
+    def __init__(self, state_file="scraper_state.db", batch_size: int = 50,
+                 commit_interval: float = 5.0, migrate_from: str = None,
+                 seen_ids_file: str = None):
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(state_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scraper_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS processed_urls (
+                url TEXT PRIMARY KEY,
+                listing_id TEXT,
+                processed_at REAL
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+        super().__init__(state_file, seen_ids_file)
+        if not self.state and migrate_from and os.path.exists(migrate_from):
+            self.migrate_json(migrate_from)
+            if not len(self.seen_ids):
+                self.seen_ids.update(id_from_url(url) for url in self.state.processed_urls)
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    def _commit(self):
+        with self._lock:
+            self.conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def _new_processed_urls(self):
+        self._execute("DELETE FROM processed_urls")
+        return ProcessedURLs(self)
+
+    def migrate_json(self, json_file: str):
+        """Import a state file written by the JSON StateManager"""
+        # Read the file directly, a StateManager would open a second handle on our seen id set
+        try:
+            legacy = read_json_state(json_file)
+        except Exception as e:
+            print(f"Error loading state: {e}")
+            return None
+        # JSON states keep no per URL times, the last update is the closest known one
+        processed_at = legacy.last_update.timestamp()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO processed_urls (url, listing_id, processed_at) VALUES (?, NULL, ?)",
+                ((url, processed_at) for url in legacy.processed_urls)
+            )
+        legacy.processed_urls = ProcessedURLs(self)
+        self.state = legacy
+        self.save_state()
+        print(f"Migrated state from {json_file} to {self.state_file}")
+        return self.state
+
+    def load_state(self) -> Optional[ScraperState]:
+        """Load state from the database if exists"""
+        try:
+            row = self._execute("SELECT data FROM scraper_state WHERE id = 1").fetchone()
+            if row:
+                data = json.loads(row[0])
+                data['start_time'] = datetime.fromisoformat(data['start_time'])
+                data['last_update'] = datetime.fromisoformat(data['last_update'])
+                self.state = ScraperState(processed_urls=ProcessedURLs(self), **data)
+                return self.state
+        except Exception as e:
+            print(f"Error loading state: {e}")
+        return None
+
+    def _write_state(self):
+        self.state.last_update = datetime.now()
+        state_dict = {
+            f.name: getattr(self.state, f.name)
+            for f in fields(self.state) if f.name != 'processed_urls'
+        }
+        state_dict['start_time'] = state_dict['start_time'].isoformat()
+        state_dict['last_update'] = state_dict['last_update'].isoformat()
+        self._execute(
+            "INSERT OR REPLACE INTO scraper_state (id, data) VALUES (1, ?)",
+            (json.dumps(state_dict),)
+        )
+
+    def save_state(self):
+        """Write state and commit everything pending"""
+        if self.state:
+            try:
+                with metrics.timer('state_save'):
+                    self._write_state()
+                    self._commit()
+            except Exception as e:
+                print(f"Error saving state: {e}")
+
+    def update_progress(self, listing_id: str, listing_url: str):
+        """Update state with processed listing, committed in batches"""
+        if self.state:
+            self.state.last_processed_id = listing_id
+            self.state.processed_urls.append(listing_url, listing_id)
+            self.seen_ids.add(listing_id)
+            self.state.total_processed += 1
+            self._pending += 1
+            if (self._pending >= self.batch_size
+                    or time.monotonic() - self._last_commit >= self.commit_interval):
+                self.save_state()
+
+    def close(self):
+        self.save_state()
+        super().close()
+        with self._lock:
+            self.conn.close()
+
+
+def create_state_manager(state_file: str, backend: str = 'sqlite', seen_ids_file: str = None) -> StateManager:
+    """Open a state manager, migrating a JSON state file to SQLite if needed"""
+    if backend == 'json':
+        return StateManager(state_file, seen_ids_file)
+    root, ext = os.path.splitext(state_file)
+    if ext == '.json':
+        return SQLiteStateManager(root + '.db', migrate_from=state_file, seen_ids_file=seen_ids_file)
+    return SQLiteStateManager(state_file, seen_ids_file=seen_ids_file)
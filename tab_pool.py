@@ -0,0 +1,69 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Any
+import logging
+
+class TabPool:
+    """Spreads detail page fetches over several tabs of one browser.
+
+    Every tab gets its own scraper view (and so its own CloudflareBypasser),
+    results are yielded back in submission order so callers can keep
+    processing listings deterministically.
+    """
+    def __init__(self, scraper, concurrency: int):
+        self.logger = logging.getLogger(__name__)
+        self.concurrency = max(1, concurrency)
+        self.tabs = Queue()
+        self._tab_scrapers = []
+        for _ in range(self.concurrency):
+            tab_scraper = scraper.open_tab()
+            self._tab_scrapers.append(tab_scraper)
+            self.tabs.put(tab_scraper)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix='detail-tab'
+        )
+        self.logger.info(f"Opened {self.concurrency} detail tabs")
+
+    def _fetch(self, url: str, should_continue: Callable[[], bool]):
+        if not should_continue():
+            return None
+        tab_scraper = self.tabs.get()
+        try:
+            return tab_scraper.scrape_detail_page(url)
+        finally:
+            self.tabs.put(tab_scraper)
+
+    def submit(self, url: str, should_continue: Optional[Callable[[], bool]] = None) -> Future:
+        """Schedule one detail fetch, returns a Future of (details, contact)"""
+        return self.executor.submit(self._fetch, url, should_continue or (lambda: True))
+
+    def map(self, items: Iterable[Any], get_url: Callable[[Any], str],
+            should_continue: Optional[Callable[[], bool]] = None
+            ) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """Yield (item, details, error) for every item in input order"""
+        should_continue = should_continue or (lambda: True)
+        futures = [
+            (item, self.submit(get_url(item), should_continue))
+            for item in items
+        ]
+        try:
+            for item, future in futures:
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # Consumer stopped early, drop whatever has not started yet
+            for _, future in futures:
+                future.cancel()
+
+    def close(self):
+        """Shutdown workers and close the extra tabs"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for tab_scraper in self._tab_scrapers:
+            try:
+                tab_scraper.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close tab: {e}")
+        self._tab_scrapers = []
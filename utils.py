@@ -3,9 +3,8 @@ def isPageChanged(chromiumPage, url, function):
     def wrapper(self, *args, **kwargs):
         self.page.get(url)
         self.cf_bypasser.bypass()
-        while self.page.url_available is False:
-            time.sleep(1)
-        time.sleep(self.delay)
+        if self.page.url_available is False:
+            self.page.wait.doc_loaded()
         if self.page.url != url:
             self.logger.info(f"Redirected to: {self.page.url}")
             self.cf_bypasser.bypass()
@@ -0,0 +1,249 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    payload TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    updated_at REAL,
+    UNIQUE (kind, url)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, lease_expires);
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass
+class Task:
+    id: int
+    kind: str
+    url: str
+    payload: Optional[Dict[str, Any]]
+    attempts: int
+
+
+class WorkQueue:
+    """Crash-safe queue of page and detail work shared by several workers.
+
+    Backed by one SQLite file that all workers open, which covers processes
+    on one host or hosts sharing a filesystem with working locks. Tasks are
+    leased for lease_timeout seconds; a worker that dies stops heartbeating
+    and its leases expire back to pending. Each URL is queued once per kind,
+    so re-queuing work found again by another worker is a no-op.
+    """
+    def __init__(self, db_file: str, lease_timeout: float = 120.0, max_attempts: int = 3):
+        self.db_file = db_file
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        # Autocommit, transactions are opened explicitly where they matter
+        self.conn = sqlite3.connect(db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def enqueue(self, kind: str, url: str, payload: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue a task, returns False if the URL was already queued for this kind"""
+        return self.enqueue_many(kind, [(url, payload)]) == 1
+
+    def enqueue_many(self, kind: str, items: Iterable) -> int:
+        """Queue (url, payload) pairs in one transaction, returns how many were new"""
+        rows = [
+            (kind, url, json.dumps(payload, ensure_ascii=False) if payload is not None else None, time.time())
+            for url, payload in items
+        ]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (kind, url, payload, updated_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                added = self.conn.total_changes - before
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def lease(self, worker: str, limit: int = 1) -> List[Task]:
+        """Lease up to limit pending or expired tasks, detail work before pages"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.conn.execute(
+                    """
+                    SELECT id, kind, url, payload, attempts FROM tasks
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY kind = 'page', id
+                    LIMIT ?
+                    """,
+                    (now, limit)
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                    [(worker, now + self.lease_timeout, now, row[0]) for row in rows]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return [
+            Task(row[0], row[1], row[2], json.loads(row[3]) if row[3] else None, row[4])
+            for row in rows
+        ]
+
+    def heartbeat(self, worker: str, task_ids: Iterable[int]) -> int:
+        """Extend the leases a worker still holds, returns how many were extended"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return 0
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.executemany(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                [(now + self.lease_timeout, now, task_id, worker) for task_id in task_ids]
+            )
+            return cursor.rowcount
+
+    def ack(self, worker: str, task_id: int) -> bool:
+        """Mark a task done, False if the lease was lost to another worker"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), task_id, worker)
+            )
+        if not cursor.rowcount:
+            self.logger.warning(f"Lease of task {task_id} was lost before it was acknowledged")
+        return bool(cursor.rowcount)
+
+    def release(self, worker: str, task_id: int, error: Optional[str] = None):
+        """Return a failed task to the queue, it fails for good after max_attempts"""
+        with self._lock:
+            self.conn.execute(
+                """
+                UPDATE tasks SET
+                    attempts = attempts + 1,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                    worker = NULL, lease_expires = NULL, error = ?, updated_at = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'
+                """,
+                (self.max_attempts, error, time.time(), task_id, worker)
+            )
+
+    def give_back(self, worker: str, task_id: int):
+        """Return an unfinished task without counting it as a failed attempt"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), task_id, worker)
+            )
+
+    def requeue_failed(self) -> int:
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0, error = NULL WHERE status = 'failed'"
+            )
+            return cursor.rowcount
+
+    def is_drained(self) -> bool:
+        """True once no task is pending or leased"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM tasks WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+        return row is None
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Task counts per kind and status"""
+        with self._lock:
+            rows = self.conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status").fetchall()
+        stats: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class LeaseKeeper:
+    """Background thread that heartbeats the leases a worker holds"""
+    def __init__(self, queue: WorkQueue, worker: str, interval: Optional[float] = None):
+        self.queue = queue
+        self.worker = worker
+        self.interval = interval or queue.lease_timeout / 3
+        self.held = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lease-keeper', daemon=True)
+        self._thread.start()
+
+    def hold(self, task_ids: Iterable[int]):
+        with self._lock:
+            self.held.update(task_ids)
+
+    def drop(self, task_id: int):
+        with self._lock:
+            self.held.discard(task_id)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                held = list(self.held)
+            try:
+                self.queue.heartbeat(self.worker, held)
+            except Exception as e:
+                self.queue.logger.warning(f"Heartbeat failed: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a shared crawl work queue")
+    parser.add_argument("db", help="Work queue database")
+    parser.add_argument("--requeue-failed", action="store_true", help="Give failed tasks another round of attempts")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.db)
+    try:
+        if args.requeue_failed:
+            print(f"Requeued {queue.requeue_failed()} failed tasks")
+        for kind, counts in sorted(queue.stats().items()):
+            print(f"{kind}: " + ', '.join(f"{status}={count}" for status, count in sorted(counts.items())))
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()